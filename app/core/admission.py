@@ -0,0 +1,141 @@
+from typing import Dict
+import asyncio
+import logging
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ConcurrencyLimiter:
+    """
+    Ограничение числа одновременно выполняемых запросов одного класса
+    с ограниченной очередью ожидания и таймаутом.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int,
+        queue_size: int,
+        queue_timeout: float
+    ):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.active = 0
+        self.waiting = 0
+        self.rejected = 0
+
+    async def acquire(self) -> bool:
+        """
+        Занять слот. Возвращает False, если очередь переполнена
+        или слот не освободился за queue_timeout.
+        """
+        if not self._semaphore.locked():
+            # Свободный слот занимается без ожидания
+            await self._semaphore.acquire()
+            self.active += 1
+            return True
+
+        if self.waiting >= self.queue_size:
+            self.rejected += 1
+            return False
+
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            return False
+        finally:
+            self.waiting -= 1
+
+        self.active += 1
+        return True
+
+    def release(self) -> None:
+        self.active -= 1
+        self._semaphore.release()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "limit": self.max_concurrency,
+            "active": self.active,
+            "waiting": self.waiting,
+            "rejected": self.rejected,
+        }
+
+
+class AdmissionControlMiddleware:
+    """
+    ASGI middleware с классами приоритета по маршрутам.
+
+    Тяжелые маршруты (вход через LDAP, выдача токенов сервисам, поиск
+    пользователей) выполняются через свой ConcurrencyLimiter,
+    при насыщении клиент получает 503 с Retry-After. Маршруты, для которых
+    лимитер не задан (validate, me), не ограничиваются и не ждут в общей очереди,
+    поэтому волна входов не занимает их ресурсы (потоки, соединения с БД).
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        limiters: Dict[str, ConcurrencyLimiter],
+        retry_after: int
+    ):
+        self.app = app
+        self.limiters = limiters
+        self.retry_after = retry_after
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        limiter = self.limiters.get(scope["path"]) if scope["type"] == "http" else None
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not await limiter.acquire():
+            # Под нагрузкой отказов много - счетчики доступны в /health
+            logger.debug(f"Admission control: rejected request to {scope['path']} ({limiter.name})")
+            response = JSONResponse(
+                {"detail": "Сервис перегружен. Повторите попытку позже."},
+                status_code=503,
+                headers={"Retry-After": str(self.retry_after)}
+            )
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
+
+
+# Маршруты с ограничением; остальные (validate, me, users/{username}) не ограничиваются
+# и не ждут в очередях - для них остается запас пула БД и потоков
+admission_limiters: Dict[str, ConcurrencyLimiter] = {
+    "/auth/login": ConcurrencyLimiter(
+        name="login",
+        max_concurrency=settings.LOGIN_MAX_CONCURRENCY,
+        queue_size=settings.LOGIN_QUEUE_SIZE,
+        queue_timeout=settings.LOGIN_QUEUE_TIMEOUT_SECONDS
+    ),
+    # Без аутентификации и с bcrypt в пуле потоков - ограничивается как вход
+    "/auth/token": ConcurrencyLimiter(
+        name="client_token",
+        max_concurrency=settings.CLIENT_TOKEN_MAX_CONCURRENCY,
+        queue_size=settings.CLIENT_TOKEN_QUEUE_SIZE,
+        queue_timeout=settings.CLIENT_TOKEN_QUEUE_TIMEOUT_SECONDS
+    ),
+    "/auth/users": ConcurrencyLimiter(
+        name="user_search",
+        max_concurrency=settings.USER_SEARCH_MAX_CONCURRENCY,
+        queue_size=settings.USER_SEARCH_QUEUE_SIZE,
+        queue_timeout=settings.USER_SEARCH_QUEUE_TIMEOUT_SECONDS
+    ),
+}
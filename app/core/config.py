@@ -20,15 +20,69 @@ class Settings(BaseSettings):
     LDAP_USER_SUFFIX: str = "@utz.local"
     LDAP_BIND_USER: str = ""
     LDAP_BIND_PASSWORD: str = ""
+    # Атрибуты пользователя, запрашиваемые при входе (только то, что хранится в users)
+    LDAP_USER_ATTRIBUTES: str = "sAMAccountName,cn,mail,displayName,memberOf"
 
     # JWT
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    GROUP_CLAIMS_ENABLED: bool = False  # группы в access токене (claims grp/gv), opt-in
+    SERVICE_TOKEN_EXPIRE_MINUTES: int = 60  # токены client_credentials
+
+    # Service clients: кеш проверенных секретов (выдача токена без bcrypt)
+    CLIENT_CACHE_TTL_SECONDS: int = 300
+    CLIENT_CACHE_MAX_ENTRIES: int = 1000
 
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
+    REDIS_CONNECT_TIMEOUT_SECONDS: float = 0.5
+    REDIS_SOCKET_TIMEOUT_SECONDS: float = 1.0
+
+    # Credential cache (повторные входы без LDAP bind)
+    CREDENTIAL_CACHE_ENABLED: bool = False
+    CREDENTIAL_CACHE_TTL_SECONDS: int = 300
+    CREDENTIAL_CACHE_OUTAGE_TTL_SECONDS: int = 3600
+    CREDENTIAL_CACHE_MAX_ENTRIES: int = 10000
+
+    # Audit log
+    AUDIT_ENABLED: bool = True
+    AUDIT_BUFFER_SIZE: int = 10000
+    AUDIT_BATCH_SIZE: int = 500
+    AUDIT_FLUSH_INTERVAL_SECONDS: float = 1.0
+
+    # Admission control
+    # Лимиты входов и поиска вместе держим ниже пула соединений БД (5 + 10),
+    # входов и выдачи токенов - ниже пула потоков (40): validate, me и
+    # users/{username} всегда получают соединение и не ждут в очереди
+    ADMISSION_CONTROL_ENABLED: bool = True
+    LOGIN_MAX_CONCURRENCY: int = 8
+    LOGIN_QUEUE_SIZE: int = 200
+    LOGIN_QUEUE_TIMEOUT_SECONDS: float = 10.0
+    # Выдача токенов сервисам: bcrypt в общем пуле потоков
+    CLIENT_TOKEN_MAX_CONCURRENCY: int = 4
+    CLIENT_TOKEN_QUEUE_SIZE: int = 100
+    CLIENT_TOKEN_QUEUE_TIMEOUT_SECONDS: float = 10.0
+    # Поиск пользователей: ILIKE по всей таблице держит соединение БД
+    USER_SEARCH_MAX_CONCURRENCY: int = 4
+    USER_SEARCH_QUEUE_SIZE: int = 100
+    USER_SEARCH_QUEUE_TIMEOUT_SECONDS: float = 5.0
+    ADMISSION_RETRY_AFTER_SECONDS: int = 2
+
+    # User change feed (Redis)
+    USER_EVENTS_ENABLED: bool = True
+    USER_EVENTS_BACKLOG: int = 10000
+    USER_EVENTS_KEEPALIVE_SECONDS: float = 15.0
+
+    # Cache invalidation bus between workers: redis | local
+    INVALIDATION_BUS: str = "redis"
+
+    # Slow request profiler (opt-in)
+    PROFILER_ENABLED: bool = False
+    PROFILER_THRESHOLD_MS: int = 500
+    PROFILER_SAMPLE_INTERVAL_MS: int = 10
+    PROFILER_MAX_PROFILES: int = 50
 
     # CORS
     ALLOWED_ORIGINS: str = "*"
@@ -43,6 +97,10 @@ class Settings(BaseSettings):
             return ["*"]
         return [origin.strip() for origin in self.ALLOWED_ORIGINS.split(",")]
 
+    @property
+    def ldap_user_attributes_list(self) -> List[str]:
+        return [attr.strip() for attr in self.LDAP_USER_ATTRIBUTES.split(",") if attr.strip()]
+
 
 settings = Settings()
 
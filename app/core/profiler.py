@@ -0,0 +1,245 @@
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Awaitable, Deque, Dict, Iterable, Iterator, List, Optional, TypeVar
+import asyncio
+import itertools
+import time
+import logging
+import weakref
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class RequestProfile:
+    """
+    Профиль одного запроса: время по этапам и выборка стеков корутины.
+    followed - общие задачи (SingleFlight), результат которых ждет запрос.
+    """
+
+    __slots__ = ("method", "path", "started", "stages", "samples", "followed")
+
+    def __init__(self, method: str, path: str):
+        self.method = method
+        self.path = path
+        self.started = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+        self.samples: Counter = Counter()
+        self.followed: List[asyncio.Task] = []
+
+    def add_stage(self, name: str, seconds: float) -> None:
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def merge_followed_stages(self) -> None:
+        for task in self.followed:
+            shared = _shared_profiles.get(task)
+            if shared is not None:
+                for name, seconds in shared.stages.items():
+                    self.add_stage(name, seconds)
+
+
+_current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("request_profile", default=None)
+
+# Профили общих задач: этапы записываются один раз и достаются всем ожидающим
+_shared_profiles: "weakref.WeakKeyDictionary[asyncio.Task, RequestProfile]" = weakref.WeakKeyDictionary()
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """
+    Замер этапа запроса (ldap, db, jwt, serialization).
+    Без активного профилировщика - ничего не делает.
+    """
+    profile = _current_profile.get()
+    if profile is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add_stage(name, time.perf_counter() - start)
+
+
+def spawn_shared(coro: Awaitable[T]) -> "asyncio.Task[T]":
+    """
+    Задача, результат которой ждут несколько запросов (SingleFlight).
+
+    Задача получает собственный профиль: время этапов внутри нее не
+    относится только к запросу, который ее запустил. Ожидающие запросы
+    подключаются через follow_task.
+    """
+    if _current_profile.get() is None:
+        return asyncio.ensure_future(coro)
+    shared = RequestProfile("task", "")
+    token = _current_profile.set(shared)
+    try:
+        task = asyncio.ensure_future(coro)
+    finally:
+        _current_profile.reset(token)
+    _shared_profiles[task] = shared
+    return task
+
+
+def follow_task(task: asyncio.Task) -> None:
+    """
+    Текущий запрос ждет task: ее стек дописывается к стекам запроса,
+    а время этапов - к профилю запроса.
+    """
+    profile = _current_profile.get()
+    if profile is not None and task not in profile.followed:
+        profile.followed.append(task)
+
+
+def _collapse_stack(task: asyncio.Task) -> Optional[str]:
+    """
+    Стек приостановленной корутины по цепочке cr_await (Task.get_stack()
+    для корутины возвращает только внешний кадр). Ожидание другой задачи
+    продолжается в ее корутине.
+    """
+    frames = []
+    awaitable = task.get_coro()
+    while awaitable is not None:
+        if isinstance(awaitable, asyncio.Task):
+            awaitable = awaitable.get_coro()
+            continue
+        frame = getattr(awaitable, "cr_frame", None) or getattr(awaitable, "gi_frame", None)
+        if frame is None:
+            break
+        frames.append(
+            f"{frame.f_code.co_filename.rsplit('/', 1)[-1]}:{frame.f_code.co_name}:{frame.f_lineno}"
+        )
+        awaitable = getattr(awaitable, "cr_await", None) or getattr(awaitable, "gi_yieldfrom", None)
+    return ";".join(frames) or None
+
+
+class ProfileStore:
+    """
+    Кольцевой буфер сохраненных профилей медленных запросов.
+    """
+
+    def __init__(self, max_profiles: int):
+        self._profiles: Deque[Dict] = deque(maxlen=max_profiles)
+        self._ids = itertools.count(1)
+
+    def add(self, profile: Dict) -> None:
+        profile["id"] = next(self._ids)
+        self._profiles.append(profile)
+
+    def list(self) -> List[Dict]:
+        return [
+            {key: value for key, value in profile.items() if key != "samples"}
+            for profile in reversed(self._profiles)
+        ]
+
+    def get(self, profile_id: int) -> Optional[Dict]:
+        for profile in self._profiles:
+            if profile["id"] == profile_id:
+                return profile
+        return None
+
+    def clear(self) -> None:
+        self._profiles.clear()
+
+
+class SlowRequestProfilerMiddleware:
+    """
+    ASGI middleware: профилирование медленных запросов.
+
+    Для каждого запроса ставится таймер на THRESHOLD; если запрос завершился
+    раньше, таймер отменяется и других затрат нет. Если запрос все еще
+    выполняется, с периодом INTERVAL снимаются стеки его корутины
+    (где именно он ждет: LDAP, БД и т.п.). Профиль запроса дольше порога
+    сохраняется в кольцевой буфер вместе с временем по этапам.
+
+    Потоковые ответы (SSE) не профилируются: пути exclude_paths пропускаются
+    целиком, а для ответа с Content-Type text/event-stream таймер снимается
+    на http.response.start - иначе многочасовой поток сэмплировался бы
+    все время и вытеснял профили из буфера.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        store: ProfileStore,
+        threshold: float,
+        interval: float,
+        exclude_paths: Iterable[str] = ()
+    ):
+        self.app = app
+        self.store = store
+        self.threshold = threshold
+        self.interval = interval
+        self.exclude_paths = frozenset(exclude_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(scope["method"], scope["path"])
+        token = _current_profile.set(profile)
+        task = asyncio.current_task()
+        loop = asyncio.get_running_loop()
+        timer = None
+
+        def sample() -> None:
+            nonlocal timer
+            stack = _collapse_stack(task)
+            # Запрос ждет общую задачу: реальная работа (LDAP, БД) идет в ней
+            for followed in profile.followed:
+                if not followed.done():
+                    shared_stack = _collapse_stack(followed)
+                    if shared_stack:
+                        stack = f"{stack};{shared_stack}" if stack else shared_stack
+                    break
+            if stack:
+                profile.samples[stack] += 1
+            timer = loop.call_later(self.interval, sample)
+
+        timer = loop.call_later(self.threshold, sample)
+        status_code = 500
+        streaming = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, streaming
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                for name, value in message.get("headers", ()):
+                    if name.lower() == b"content-type" and value.startswith(b"text/event-stream"):
+                        streaming = True
+                        timer.cancel()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            timer.cancel()
+            _current_profile.reset(token)
+            duration = time.perf_counter() - profile.started
+            if duration >= self.threshold and not streaming:
+                profile.merge_followed_stages()
+                self._save(profile, status_code, duration)
+
+    def _save(self, profile: RequestProfile, status_code: int, duration: float) -> None:
+        self.store.add({
+            "method": profile.method,
+            "path": profile.path,
+            "status": status_code,
+            "duration_ms": round(duration * 1000, 2),
+            "captured_at": datetime.utcnow().isoformat(),
+            "stages_ms": {name: round(seconds * 1000, 2) for name, seconds in profile.stages.items()},
+            "samples": dict(profile.samples.most_common()),
+        })
+        logger.info(f"Slow request profiled: {profile.method} {profile.path} {duration * 1000:.0f} ms")
+
+
+profile_store = ProfileStore(settings.PROFILER_MAX_PROFILES)
@@ -0,0 +1,32 @@
+from typing import Any
+import json
+
+from fastapi.responses import JSONResponse
+
+from app.core.profiler import stage
+
+try:
+    import orjson
+except ImportError:  # orjson не установлен - используем стандартный json
+    orjson = None
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON-ответ с сериализацией через orjson (если установлен).
+
+    Эндпоинты горячего пути возвращают его напрямую с уже готовым dict:
+    FastAPI в этом случае не выполняет повторную валидацию response_model
+    и jsonable_encoder.
+    """
+
+    def render(self, content: Any) -> bytes:
+        with stage("serialization"):
+            if orjson is not None:
+                return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+            return json.dumps(
+                content,
+                ensure_ascii=False,
+                allow_nan=False,
+                separators=(",", ":")
+            ).encode("utf-8")
@@ -1,9 +1,10 @@
 from datetime import datetime, timedelta, timezone
-from typing import Optional, Dict
+from typing import Optional, Dict, List, Set
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
 from app.core.config import settings
+from app.core.profiler import stage
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -26,11 +27,12 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
         "type": "access"
     })
     
-    encoded_jwt = jwt.encode(
-        to_encode,
-        settings.SECRET_KEY,
-        algorithm=settings.ALGORITHM
-    )
+    with stage("jwt"):
+        encoded_jwt = jwt.encode(
+            to_encode,
+            settings.SECRET_KEY,
+            algorithm=settings.ALGORITHM
+        )
     
     return encoded_jwt
 
@@ -49,25 +51,62 @@ def create_refresh_token(data: dict) -> str:
         "type": "refresh"
     })
     
-    encoded_jwt = jwt.encode(
-        to_encode,
-        settings.SECRET_KEY,
-        algorithm=settings.ALGORITHM
+    with stage("jwt"):
+        encoded_jwt = jwt.encode(
+            to_encode,
+            settings.SECRET_KEY,
+            algorithm=settings.ALGORITHM
+        )
+    
+    return encoded_jwt
+
+
+def create_service_token(client_id: str, scopes: List[str]) -> str:
+    """
+    Создание токена сервисного клиента (client_credentials).
+    Scope передаются в токене - проверка не требует обращения к БД.
+    """
+    expire = datetime.now(timezone.utc) + timedelta(
+        minutes=settings.SERVICE_TOKEN_EXPIRE_MINUTES
     )
     
+    to_encode = {
+        "sub": client_id,
+        "scope": " ".join(scopes),
+        "exp": expire,
+        "type": "service"
+    }
+    
+    with stage("jwt"):
+        encoded_jwt = jwt.encode(
+            to_encode,
+            settings.SECRET_KEY,
+            algorithm=settings.ALGORITHM
+        )
+    
     return encoded_jwt
 
 
+def token_scopes(payload: Dict) -> Set[str]:
+    """
+    Scope из декодированного токена сервисного клиента.
+    """
+    if payload.get("type") != "service":
+        return set()
+    return set(payload.get("scope", "").split())
+
+
 def decode_token(token: str) -> Optional[Dict]:
     """
     Декодирование и валидация токена.
     """
     try:
-        payload = jwt.decode(
-            token,
-            settings.SECRET_KEY,
-            algorithms=[settings.ALGORITHM]
-        )
+        with stage("jwt"):
+            payload = jwt.decode(
+                token,
+                settings.SECRET_KEY,
+                algorithms=[settings.ALGORITHM]
+            )
         return payload
     except JWTError:
         return None
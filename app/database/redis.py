@@ -0,0 +1,11 @@
+import redis.asyncio as redis
+
+from app.core.config import settings
+
+# Общий клиент Redis (соединения открываются лениво, при первом запросе)
+redis_client = redis.from_url(
+    settings.REDIS_URL,
+    decode_responses=True,
+    socket_connect_timeout=settings.REDIS_CONNECT_TIMEOUT_SECONDS,
+    socket_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS
+)
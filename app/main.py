@@ -4,11 +4,22 @@ from fastapi.staticfiles import StaticFiles
 from pathlib import Path
 import logging
 from sqlalchemy import text
+from sqlalchemy.schema import CreateIndex
 
 from app.core.config import settings
-from app.routers import auth, frontend
+from app.core.admission import AdmissionControlMiddleware, admission_limiters
+from app.core.profiler import SlowRequestProfilerMiddleware, profile_store
+from app.core.responses import FastJSONResponse
+from app.routers import auth, audit, clients, events, groups, profiles, frontend
 from app.database.session import engine, Base
-from app.models.user import User
+from app.models.user import User, USER_VERSION_TRIGGER_DDL
+from app.models.audit import AuthAuditEvent
+from app.models.group import LdapGroup
+from app.models.client import ServiceClient
+from app.services.audit_service import audit_log
+from app.services.invalidation_bus import invalidation_bus
+from app.services.client_registry import client_registry
+from app.database.redis import redis_client
 
 # Настройка логирования
 logging.basicConfig(
@@ -21,7 +32,8 @@ BASE_DIR = Path(__file__).parent.parent
 
 app = FastAPI(
     title=settings.APP_NAME,
-    debug=settings.DEBUG
+    debug=settings.DEBUG,
+    default_response_class=FastJSONResponse
 )
 
 # Подключаем статические файлы
@@ -29,6 +41,24 @@ static_dir = BASE_DIR / "static"
 if static_dir.exists():
     app.mount("/static", StaticFiles(directory=str(static_dir)), name="static")
 
+# Ограничение нагрузки (до CORS, чтобы ответы 503 тоже получали CORS-заголовки)
+if settings.ADMISSION_CONTROL_ENABLED:
+    app.add_middleware(
+        AdmissionControlMiddleware,
+        limiters=admission_limiters,
+        retry_after=settings.ADMISSION_RETRY_AFTER_SECONDS
+    )
+
+# Профилирование медленных запросов (внешний слой - время с учетом очереди admission)
+if settings.PROFILER_ENABLED:
+    app.add_middleware(
+        SlowRequestProfilerMiddleware,
+        store=profile_store,
+        threshold=settings.PROFILER_THRESHOLD_MS / 1000,
+        interval=settings.PROFILER_SAMPLE_INTERVAL_MS / 1000,
+        exclude_paths=("/auth/events/users",)
+    )
+
 # CORS
 app.add_middleware(
     CORSMiddleware,
@@ -40,6 +70,11 @@ app.add_middleware(
 
 # Подключаем роутеры
 app.include_router(auth.router)
+app.include_router(audit.router)
+app.include_router(clients.router)
+app.include_router(events.router)
+app.include_router(groups.router)
+app.include_router(profiles.router)
 app.include_router(frontend.router)
 
 
@@ -56,6 +91,52 @@ async def startup_event():
     except Exception as e:
         logger.error(f"❌ Error creating database tables: {e}")
 
+    # Дальнейшая DDL выполняется отдельными транзакциями: ошибка одной
+    # (например, нет прав на CREATE EXTENSION) не откатывает остальные
+    try:
+        # create_all не меняет существующие таблицы: версия строки для ETag
+        async with engine.begin() as conn:
+            await conn.execute(text(
+                "ALTER TABLE users ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1"
+            ))
+    except Exception as e:
+        logger.error(f"❌ Error adding users.version column: {e}")
+
+    try:
+        async with engine.begin() as conn:
+            for statement in USER_VERSION_TRIGGER_DDL:
+                await conn.execute(text(statement))
+    except Exception as e:
+        logger.error(f"❌ Error creating users.version trigger: {e}")
+
+    try:
+        # Триграммные индексы для поиска пользователей
+        async with engine.begin() as conn:
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    except Exception as e:
+        logger.warning(f"⚠️  pg_trgm is not available, user search works without indexes: {e}")
+
+    # GIN-индексы поиска: триграммные create_all пропускает (см. models/user.py),
+    # а к существующей таблице он индексы не добавляет
+    for index in User.__table__.indexes:
+        if index.dialect_options["postgresql"]["using"] != "gin":
+            continue
+        try:
+            async with engine.begin() as conn:
+                await conn.execute(CreateIndex(index, if_not_exists=True))
+        except Exception as e:
+            logger.warning(f"⚠️  Index {index.name} was not created: {e}")
+
+    try:
+        # Секции журнала аудита
+        async with engine.begin() as conn:
+            await audit_log.ensure_partitions(conn)
+    except Exception as e:
+        logger.error(f"❌ Error creating audit partitions: {e}")
+
+    audit_log.start(engine)
+    invalidation_bus.start()
+
     try:
         # Пытаемся подключиться к БД
         async with engine.begin() as conn:
@@ -70,6 +151,16 @@ async def startup_event():
         logger.error(f"   Current DATABASE_URL: {settings.DATABASE_URL}")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """
+    Остановка фоновых задач с записью остатка журнала аудита.
+    """
+    await audit_log.stop()
+    await invalidation_bus.stop()
+    await redis_client.aclose()
+
+
 @app.get("/health")
 async def health_check():
     """
@@ -80,11 +171,19 @@ async def health_check():
             await conn.execute(text("SELECT 1"))
         return {
             "status": "healthy",
-            "database": "connected"
+            "database": "connected",
+            "audit": audit_log.stats(),
+            "admission": {name: limiter.stats() for name, limiter in admission_limiters.items()},
+            "invalidation_bus": invalidation_bus.stats(),
+            "client_cache": client_registry.stats()
         }
     except Exception as e:
         return {
             "status": "unhealthy",
             "database": "disconnected",
-            "error": str(e)
+            "error": str(e),
+            "audit": audit_log.stats(),
+            "admission": {name: limiter.stats() for name, limiter in admission_limiters.items()},
+            "invalidation_bus": invalidation_bus.stats(),
+            "client_cache": client_registry.stats()
         }
@@ -0,0 +1,32 @@
+from sqlalchemy import Column, BigInteger, String, Boolean, DateTime, Index
+from datetime import datetime
+
+from app.database.session import Base
+
+
+class AuthAuditEvent(Base):
+    """
+    Журнал событий аутентификации (вход, обновление токена, ошибки валидации).
+    Таблица секционирована по месяцам (RANGE по created_at),
+    секции создаются сервисом аудита.
+    """
+    __tablename__ = "auth_audit_events"
+    __table_args__ = (
+        Index("ix_auth_audit_events_created_at_id", "created_at", "id"),
+        Index("ix_auth_audit_events_username_created_at", "username", "created_at"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+    # Ключ секционирования обязан входить в первичный ключ
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    created_at = Column(DateTime, primary_key=True, default=datetime.utcnow)
+
+    event_type = Column(String, nullable=False)  # login, refresh, validate
+    success = Column(Boolean, nullable=False)
+    username = Column(String, nullable=True)
+    client_ip = Column(String, nullable=True)
+    user_agent = Column(String, nullable=True)
+    detail = Column(String, nullable=True)
+
+    def __repr__(self):
+        return f"<AuthAuditEvent {self.event_type} {self.username}>"
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, JSON
+from datetime import datetime
+
+from app.database.session import Base
+
+
+class ServiceClient(Base):
+    """
+    Сервисный клиент (OAuth2 client_credentials).
+    Секрет хранится только в виде bcrypt-хеша.
+    """
+    __tablename__ = "service_clients"
+
+    id = Column(Integer, primary_key=True)
+    client_id = Column(String, unique=True, index=True, nullable=False)
+    secret_hash = Column(String, nullable=False)
+    name = Column(String, nullable=True)
+
+    # Разрешенные scope (токен выдается с подмножеством)
+    scopes = Column(JSON, default=list)
+
+    is_active = Column(Boolean, default=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<ServiceClient {self.client_id}>"
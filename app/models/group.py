@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from datetime import datetime
+
+from app.database.session import Base
+
+
+class LdapGroup(Base):
+    """
+    Словарь групп LDAP: DN группы -> короткий числовой ID для токенов.
+    Записи только добавляются, ID не переиспользуются,
+    поэтому максимальный ID служит версией словаря.
+    """
+    __tablename__ = "ldap_groups"
+
+    id = Column(Integer, primary_key=True)
+    dn = Column(String, unique=True, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<LdapGroup {self.id} {self.dn}>"
@@ -1,9 +1,24 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, JSON
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, JSON, Index, cast
+from sqlalchemy.dialects.postgresql import JSONB
 from datetime import datetime
 
 from app.database.session import Base
 
 
+def _created_at_startup(ddl, target, bind, **kw) -> bool:
+    """
+    Триграммные индексы не создаются в create_all: без расширения pg_trgm
+    не создалась бы вся схема. Их создает startup в main.py отдельно.
+    """
+    return False
+
+
+def _trgm_index(name: str, column: str) -> Index:
+    return Index(
+        name, column, postgresql_using="gin", postgresql_ops={column: "gin_trgm_ops"}
+    ).ddl_if(callable_=_created_at_startup)
+
+
 class User(Base):
     """
     Кеш пользователей из LDAP.
@@ -24,11 +39,46 @@ class User(Base):
     is_active = Column(Boolean, default=True)
     is_superuser = Column(Boolean, default=False)
     
+    # Версия публичных данных (для ETag), увеличивается при каждом изменении:
+    # данные LDAP - в apply_ldap_data, is_active - триггером (меняется вне приложения)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    
     # Метаданные
     first_login = Column(DateTime, default=datetime.utcnow)
     last_login = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     last_sync_from_ldap = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    __table_args__ = (
+        # Поиск по подстроке (pg_trgm): username, full_name, email, cn
+        _trgm_index("ix_users_username_trgm", "username"),
+        _trgm_index("ix_users_full_name_trgm", "full_name"),
+        _trgm_index("ix_users_email_trgm", "email"),
+        _trgm_index("ix_users_cn_trgm", "cn"),
+        # Фильтр по группе: CAST(groups AS JSONB) @> '["<dn>"]'
+        Index("ix_users_groups_jsonb", cast(groups, JSONB), postgresql_using="gin"),
+    )
+    
     def __repr__(self):
         return f"<User {self.username}>"
 
+
+
+# Блокировка пользователя выполняется администратором напрямую в БД:
+# триггер увеличивает версию, чтобы ETag перестал совпадать
+USER_VERSION_TRIGGER_DDL = (
+    """
+    CREATE OR REPLACE FUNCTION users_bump_version() RETURNS trigger AS $$
+    BEGIN
+        NEW.version := OLD.version + 1;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS users_is_active_version ON users",
+    """
+    CREATE TRIGGER users_is_active_version
+    BEFORE UPDATE OF is_active ON users
+    FOR EACH ROW WHEN (OLD.is_active IS DISTINCT FROM NEW.is_active)
+    EXECUTE FUNCTION users_bump_version()
+    """,
+)
@@ -0,0 +1,94 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, tuple_
+from datetime import datetime, timezone
+from typing import Optional, Tuple
+import logging
+
+from app.database.session import get_db
+from app.models.user import User
+from app.models.audit import AuthAuditEvent
+from app.schemas.audit import AuditEvent, AuditEventPage
+from app.routers.auth import get_current_superuser
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/auth/audit", tags=["Audit"])
+
+
+def _naive_utc(value: datetime) -> datetime:
+    """
+    created_at хранится как TIMESTAMP WITHOUT TIME ZONE в UTC: значение
+    с часовым поясом (например, ...Z или +03:00 в query) приводим к UTC
+    и отбрасываем tzinfo, иначе asyncpg не сможет его передать.
+    """
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _encode_cursor(event: AuthAuditEvent) -> str:
+    return f"{event.created_at.isoformat()}|{event.id}"
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        created_at, event_id = cursor.split("|", 1)
+        return _naive_utc(datetime.fromisoformat(created_at)), int(event_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+@router.get("/events", response_model=AuditEventPage)
+async def list_audit_events(
+    username: Optional[str] = None,
+    event_type: Optional[str] = None,
+    success: Optional[bool] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_superuser)
+):
+    """
+    События аудита, от новых к старым, с keyset-пагинацией.
+    Фильтр since/until позволяет PostgreSQL отсечь лишние секции.
+    """
+    query = select(AuthAuditEvent)
+    
+    if username:
+        query = query.where(AuthAuditEvent.username == username)
+    if event_type:
+        query = query.where(AuthAuditEvent.event_type == event_type)
+    if success is not None:
+        query = query.where(AuthAuditEvent.success == success)
+    if since:
+        query = query.where(AuthAuditEvent.created_at >= _naive_utc(since))
+    if until:
+        query = query.where(AuthAuditEvent.created_at < _naive_utc(until))
+    if cursor:
+        created_at, event_id = _decode_cursor(cursor)
+        query = query.where(
+            tuple_(AuthAuditEvent.created_at, AuthAuditEvent.id) < tuple_(created_at, event_id)
+        )
+    
+    query = query.order_by(
+        AuthAuditEvent.created_at.desc(),
+        AuthAuditEvent.id.desc()
+    ).limit(limit + 1)
+    
+    result = await db.execute(query)
+    events = result.scalars().all()
+    
+    next_cursor = None
+    if len(events) > limit:
+        events = events[:limit]
+        next_cursor = _encode_cursor(events[-1])
+    
+    return AuditEventPage(
+        items=[AuditEvent.model_validate(event) for event in events],
+        next_cursor=next_cursor
+    )
@@ -1,12 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import select, or_, cast
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.exc import SQLAlchemyError, IntegrityError
+from starlette.concurrency import run_in_threadpool
 from datetime import datetime
+from typing import Callable, Dict, List, Optional
+import hashlib
+import hmac
 import logging
 
-from app.database.session import get_db
+from app.database.session import get_db, AsyncSessionLocal
 from app.models.user import User
 from app.schemas.auth import (
     Token, 
@@ -15,52 +20,265 @@ from app.schemas.auth import (
     TokenValidationResponse,
     RefreshTokenRequest
 )
-from app.schemas.user import UserPublic
-from app.services.ldap_service import ldap_service
+from app.schemas.user import UserPublic, UserSearchPage
+from app.services.ldap_service import ldap_service, LDAPUnavailableError
+from app.services.credential_cache import credential_cache
+from app.services.single_flight import SingleFlight
+from app.services.audit_service import audit_log
+from app.services.user_events import user_events
+from app.services.invalidation_bus import invalidation_bus, USER
+from app.services.group_dictionary import group_dictionary
 from app.core.security import (
     create_access_token,
     create_refresh_token,
-    decode_token
+    decode_token,
+    token_scopes
 )
 from app.core.config import settings
+from app.core.responses import FastJSONResponse
+from app.core.profiler import stage
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
+login_flight = SingleFlight()
 
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: AsyncSession = Depends(get_db)
-) -> User:
+def _audit(
+    request: Request,
+    event_type: str,
+    success: bool,
+    username: Optional[str] = None,
+    detail: Optional[str] = None
+) -> None:
     """
-    Получение текущего пользователя из токена.
+    Запись события в журнал аудита (буферизуется, БД не трогает).
     """
-    credentials_exception = HTTPException(
+    audit_log.record(
+        event_type=event_type,
+        success=success,
+        username=username,
+        client_ip=request.client.host if request.client else None,
+        user_agent=request.headers.get("user-agent"),
+        detail=detail
+    )
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def _user_etag(user_id: int, version: int) -> str:
+    """
+    Сильный ETag публичных данных пользователя.
+    """
+    return f'"{user_id}.{version}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    Проверка заголовка If-None-Match (слабое сравнение, RFC 9110).
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+# Колонки UserPublic - выбираются напрямую, без загрузки ORM-объекта
+_USER_PUBLIC_COLUMNS = (
+    User.username,
+    User.email,
+    User.full_name,
+    User.cn,
+    User.groups,
+    User.is_active,
+)
+
+
+def _user_public(row) -> dict:
+    """
+    Строка БД -> dict в формате UserPublic (без повторной валидации pydantic).
+    """
+    return {
+        "username": row.username,
+        "email": row.email,
+        "full_name": row.full_name,
+        "cn": row.cn,
+        "groups": row.groups or [],
+        "is_active": row.is_active,
+    }
+
+
+async def _get_user_conditional(
+    request: Request,
+    db: AsyncSession,
+    username: str
+) -> Optional[Response]:
+    """
+    Ответ с ETag. Если версия совпала с If-None-Match - 304 без загрузки строки.
+    Возвращает None, если пользователь не найден.
+    """
+    cache_control = "private, no-cache"
+    
+    if request.headers.get("if-none-match"):
+        with stage("db"):
+            result = await db.execute(
+                select(User.id, User.version).where(User.username == username)
+            )
+            row = result.one_or_none()
+        if row is None:
+            return None
+        
+        etag = _user_etag(row.id, row.version)
+        if etag_matches(request, etag):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers={"ETag": etag, "Cache-Control": cache_control}
+            )
     
-    payload = decode_token(token)
+    with stage("db"):
+        result = await db.execute(
+            select(User.id, User.version, *_USER_PUBLIC_COLUMNS).where(User.username == username)
+        )
+        row = result.one_or_none()
+    if row is None:
+        return None
+    
+    return FastJSONResponse(
+        _user_public(row),
+        headers={"ETag": _user_etag(row.id, row.version), "Cache-Control": cache_control}
+    )
+
+
+def _username_from_payload(request: Request, payload: Optional[Dict]) -> str:
     if not payload:
-        raise credentials_exception
+        _audit(request, "validate", False, detail="Invalid or expired token")
+        raise _credentials_exception()
+    
+    # Токен сервисного клиента не дает доступа от имени пользователя
+    if payload.get("type") == "service":
+        _audit(request, "validate", False, payload.get("sub"), detail="Service token")
+        raise _credentials_exception()
     
     username: str = payload.get("sub")
     if username is None:
-        raise credentials_exception
+        _audit(request, "validate", False, detail="Invalid token payload")
+        raise _credentials_exception()
     
-    result = await db.execute(
-        select(User).where(User.username == username)
-    )
-    user = result.scalar_one_or_none()
+    return username
+
+
+def _check_scopes(payload: Dict, required) -> None:
+    missing = set(required) - token_scopes(payload)
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Insufficient scope: {' '.join(sorted(missing))}",
+            headers={"WWW-Authenticate": f'Bearer scope="{" ".join(required)}"'},
+        )
+
+
+async def get_current_username(
+    request: Request,
+    token: str = Depends(oauth2_scheme)
+) -> str:
+    """
+    Получение username из токена без обращения к БД.
+    """
+    return _username_from_payload(request, decode_token(token))
+
+
+def require_scopes(*required: str, allow_users: bool = True) -> Callable:
+    """
+    Доступ сервисному клиенту с нужными scope (проверка по подписи токена,
+    без обращения к БД). allow_users=True - access токен пользователя
+    тоже принимается. Возвращает username или client_id.
+
+    Пример: Depends(require_scopes("users:read"))
+    """
+    async def dependency(request: Request, token: str = Depends(oauth2_scheme)) -> str:
+        payload = decode_token(token)
+        if payload and payload.get("type") == "service":
+            _check_scopes(payload, required)
+            return payload["sub"]
+        if not allow_users:
+            raise _credentials_exception()
+        return _username_from_payload(request, payload)
+
+    return dependency
+
+
+async def get_current_user(
+    request: Request,
+    username: str = Depends(get_current_username),
+    db: AsyncSession = Depends(get_db)
+) -> User:
+    """
+    Получение текущего пользователя из токена.
+    """
+    with stage("db"):
+        result = await db.execute(
+            select(User).where(User.username == username)
+        )
+        user = result.scalar_one_or_none()
     
     if user is None:
-        raise credentials_exception
+        _audit(request, "validate", False, username, detail="User not found")
+        raise _credentials_exception()
     
     return user
 
 
+async def get_current_superuser(
+    current_user: User = Depends(get_current_user)
+) -> User:
+    """
+    Текущий пользователь с правами администратора.
+    """
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Недостаточно прав"
+        )
+    return current_user
+
+
+def apply_ldap_data(user: User, ldap_data: dict) -> List[str]:
+    """
+    Перенос данных LDAP в пользователя. Увеличивает версию (ETag),
+    если публичные поля изменились. Используется и при входе, и при синхронизации.
+    
+    Returns:
+        Список измененных полей
+    """
+    new_values = {
+        'email': ldap_data.get('email'),
+        'full_name': ldap_data.get('full_name'),
+        'cn': ldap_data.get('cn'),
+        'groups': ldap_data.get('groups', []),
+    }
+    changed = []
+    for field, value in new_values.items():
+        if getattr(user, field) != value:
+            setattr(user, field, value)
+            changed.append(field)
+    
+    if changed:
+        # Выражение SQL: UPDATE ... SET version = version + 1 атомарен,
+        # два воркера не выдадут одну и ту же версию для разных данных
+        user.version = User.version + 1
+    return changed
+
+
 async def get_or_create_user(db: AsyncSession, ldap_data: dict) -> User:
     """
     Получить пользователя из БД или создать нового на основе LDAP данных.
@@ -74,14 +292,12 @@ async def get_or_create_user(db: AsyncSession, ldap_data: dict) -> User:
         
         if user:
             # Обновляем данные из LDAP
-            user.email = ldap_data.get('email')
-            user.full_name = ldap_data.get('full_name')
-            user.cn = ldap_data.get('cn')
-            user.groups = ldap_data.get('groups', [])
+            changed = apply_ldap_data(user, ldap_data)
+            change = "updated"
             user.last_login = datetime.utcnow()
             user.last_sync_from_ldap = datetime.utcnow()
             
-            logger.info(f"Updated user {user.username} from LDAP")
+            logger.info(f"Updated user {user.username} from LDAP (changed={changed})")
         else:
             # Создаем нового пользователя
             user = User(
@@ -91,15 +307,37 @@ async def get_or_create_user(db: AsyncSession, ldap_data: dict) -> User:
                 cn=ldap_data.get('cn'),
                 groups=ldap_data.get('groups', []),
                 is_active=True,
-                is_superuser=False
+                is_superuser=False,
+                version=1
             )
             db.add(user)
+            changed = ['email', 'full_name', 'cn', 'groups', 'is_active']
+            change = "created"
             logger.info(f"Created new user {user.username} from LDAP")
         
         await db.commit()
         await db.refresh(user)
+        
+        if changed:
+            await user_events.publish(user, change, changed)
+            # Данные в кешах других воркеров устарели
+            await invalidation_bus.invalidate(USER, user.username, local=False)
         return user
         
+    except IntegrityError:
+        # Пользователь создан параллельным запросом (другой воркер) - читаем его
+        await db.rollback()
+        result = await db.execute(
+            select(User).where(User.username == ldap_data['username'])
+        )
+        user = result.scalar_one_or_none()
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Внутренняя ошибка сервера при работе с базой данных"
+            )
+        logger.info(f"User {user.username} was created concurrently")
+        return user
     except SQLAlchemyError as e:
         logger.error(f"Database error in get_or_create_user: {e}")
         await db.rollback()
@@ -116,19 +354,79 @@ async def get_or_create_user(db: AsyncSession, ldap_data: dict) -> User:
         )
 
 
-@router.post("/login", response_model=Token)
-async def login(
-    form_data: OAuth2PasswordRequestForm = Depends(),
-    db: AsyncSession = Depends(get_db)
-):
+async def _group_claims(groups: Optional[List[str]]) -> dict:
     """
-    Аутентификация пользователя через LDAP и выдача JWT токенов.
+    Компактные claims групп для access токена (пустой dict, если отключено).
     """
-    # 1. Аутентификация в LDAP
-    ldap_data = ldap_service.authenticate(
-        form_data.username,
-        form_data.password
-    )
+    if not settings.GROUP_CLAIMS_ENABLED or groups is None:
+        return {}
+    try:
+        return await group_dictionary.token_claims(groups)
+    except Exception as e:
+        # Без групп в токене потребители обращаются к /auth/users/{username}
+        logger.error(f"Error building group claims: {e}")
+        return {}
+
+
+async def _current_groups(db: AsyncSession, username: str) -> Optional[List[str]]:
+    """
+    Группы пользователя из БД для claims при обновлении токена.
+    None при ошибке: токен выдается без групп, refresh работает без БД.
+    """
+    try:
+        with stage("db"):
+            result = await db.execute(
+                select(User.groups).where(User.username == username)
+            )
+            return result.scalar_one_or_none()
+    except Exception as e:
+        logger.error(f"Error loading groups for {username}: {e}")
+        return None
+
+
+def _login_flight_key(username: str, password: str) -> str:
+    """
+    Ключ объединения одновременных входов: username + HMAC от пароля.
+    Сам пароль в ключе не хранится.
+    """
+    digest = hmac.new(
+        settings.SECRET_KEY.encode(),
+        password.encode(),
+        hashlib.sha256
+    ).hexdigest()
+    return f"{username.strip().lower()}:{digest}"
+
+
+async def _authenticate_user(username: str, password: str) -> User:
+    """
+    Проверка учетных данных и синхронизация пользователя в БД.
+    Выполняется один раз на группу одновременных одинаковых запросов.
+    """
+    # 1. Аутентификация: сначала кеш учетных данных, затем LDAP
+    ldap_data = await credential_cache.verify(username, password)
+    
+    if ldap_data is None:
+        try:
+            with stage("ldap"):
+                ldap_data = await run_in_threadpool(
+                    ldap_service.authenticate,
+                    username,
+                    password
+                )
+        except LDAPUnavailableError:
+            # Деградированный режим: контроллер домена недоступен
+            ldap_data = await credential_cache.verify_during_outage(username, password)
+            if not ldap_data:
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Сервер LDAP недоступен. Повторите попытку позже."
+                )
+        else:
+            if ldap_data:
+                await credential_cache.store(username, password, ldap_data)
+            else:
+                # Пароль мог быть изменен - старая запись больше не валидна
+                await invalidation_bus.invalidate(USER, username)
     
     if not ldap_data:
         raise HTTPException(
@@ -138,8 +436,11 @@ async def login(
         )
     
     # 2. Создаем/обновляем пользователя в БД
+    # Собственная сессия: результат разделяется между несколькими запросами
     try:
-        user = await get_or_create_user(db, ldap_data)
+        with stage("db"):
+            async with AsyncSessionLocal() as db:
+                user = await get_or_create_user(db, ldap_data)
     except HTTPException:
         # Пробрасываем HTTPException дальше
         raise
@@ -151,6 +452,34 @@ async def login(
         )
     
     if not user.is_active:
+        await invalidation_bus.invalidate(USER, username)
+    
+    return user
+
+
+@router.post("/login", response_model=Token)
+async def login(
+    request: Request,
+    form_data: OAuth2PasswordRequestForm = Depends()
+):
+    """
+    Аутентификация пользователя через LDAP и выдача JWT токенов.
+    Одновременные одинаковые попытки входа выполняются один раз.
+    """
+    username = form_data.username
+    password = form_data.password
+    
+    try:
+        user = await login_flight.do(
+            _login_flight_key(username, password),
+            lambda: _authenticate_user(username, password)
+        )
+    except HTTPException as e:
+        _audit(request, "login", False, username, detail=str(e.detail))
+        raise
+    
+    if not user.is_active:
+        _audit(request, "login", False, user.username, detail="User disabled")
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Пользователь заблокирован"
@@ -158,60 +487,103 @@ async def login(
     
     # 3. Создаем токены
     access_token = create_access_token(
-        data={"sub": user.username, "email": user.email}
+        data={
+            "sub": user.username,
+            "email": user.email,
+            **await _group_claims(user.groups)
+        }
     )
     refresh_token = create_refresh_token(
         data={"sub": user.username}
     )
     
     logger.info(f"User {user.username} logged in successfully")
+    _audit(request, "login", True, user.username)
     
-    return {
+    return FastJSONResponse({
         "access_token": access_token,
         "refresh_token": refresh_token,
         "token_type": "bearer"
-    }
+    })
 
 
 @router.post("/validate", response_model=TokenValidationResponse)
-async def validate_token(request: TokenValidationRequest):
+async def validate_token(
+    request: TokenValidationRequest,
+    http_request: Request
+):
     """
     Валидация токена (для других сервисов).
+
+    Токен сервисного клиента считается действительным только при
+    allow_service=true: существующие потребители проверяют лишь valid
+    и считают вызывающего пользователем.
     """
     payload = decode_token(request.token)
     
     if not payload:
-        return TokenValidationResponse(
-            valid=False,
-            message="Invalid or expired token"
-        )
+        _audit(http_request, "validate", False, detail="Invalid or expired token")
+        return FastJSONResponse({
+            "valid": False,
+            "username": None,
+            "message": "Invalid or expired token"
+        })
+    
+    if payload.get("type") == "service":
+        if not request.allow_service:
+            _audit(http_request, "validate", False, payload.get("sub"), detail="Service token")
+            return FastJSONResponse({
+                "valid": False,
+                "username": None,
+                "message": "Not a user token"
+            })
+        # Токен сервисного клиента: вместо username - client_id и scope
+        return FastJSONResponse({
+            "valid": True,
+            "username": None,
+            "token_type": "service",
+            "client_id": payload.get("sub"),
+            "scopes": sorted(token_scopes(payload)),
+            "message": None
+        })
     
     username = payload.get("sub")
     if not username:
-        return TokenValidationResponse(
-            valid=False,
-            message="Invalid token payload"
-        )
+        _audit(http_request, "validate", False, detail="Invalid token payload")
+        return FastJSONResponse({
+            "valid": False,
+            "username": None,
+            "message": "Invalid token payload"
+        })
     
-    return TokenValidationResponse(
-        valid=True,
-        username=username
-    )
+    return FastJSONResponse({
+        "valid": True,
+        "username": username,
+        "message": None
+    })
 
 
 @router.get("/me", response_model=UserPublic)
 async def get_current_user_info(
-    current_user: User = Depends(get_current_user)
+    request: Request,
+    username: str = Depends(get_current_username),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Получение информации о текущем пользователе.
+    Поддерживает ETag / If-None-Match.
     """
-    return current_user
+    user_response = await _get_user_conditional(request, db, username)
+    if user_response is None:
+        _audit(request, "validate", False, username, detail="User not found")
+        raise _credentials_exception()
+    return user_response
 
 
 @router.post("/refresh", response_model=Token)
 async def refresh_token(
     request: RefreshTokenRequest,
+    http_request: Request,
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -224,42 +596,101 @@ async def refresh_token(
     
     payload = decode_token(request.refresh_token)
     if not payload or payload.get("type") != "refresh":
+        _audit(http_request, "refresh", False, detail="Invalid refresh token")
         raise credentials_exception
     
     username = payload.get("sub")
     if not username:
+        _audit(http_request, "refresh", False, detail="Invalid token payload")
         raise credentials_exception
     
+    # Актуальные группы для нового access токена
+    groups = await _current_groups(db, username) if settings.GROUP_CLAIMS_ENABLED else None
+    
     # Создаем новые токены
-    access_token = create_access_token(data={"sub": username})
+    access_token = create_access_token(
+        data={"sub": username, **await _group_claims(groups)}
+    )
     new_refresh_token = create_refresh_token(data={"sub": username})
+    _audit(http_request, "refresh", True, username)
     
-    return {
+    return FastJSONResponse({
         "access_token": access_token,
         "refresh_token": new_refresh_token,
         "token_type": "bearer"
-    }
+    })
 
 
 @router.get("/users/{username}", response_model=UserPublic)
 async def get_user_by_username(
     username: str,
+    request: Request,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    caller: str = Depends(require_scopes("users:read"))
 ):
     """
     Получение информации о пользователе по username (для других сервисов).
+    Доступно пользователю или сервисному клиенту со scope users:read.
+    Поддерживает ETag / If-None-Match.
     """
-    result = await db.execute(
-        select(User).where(User.username == username)
-    )
-    user = result.scalar_one_or_none()
+    user_response = await _get_user_conditional(request, db, username)
     
-    if not user:
+    if user_response is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
     
-    return user
+    return user_response
+
 
+@router.get("/users", response_model=UserSearchPage)
+async def search_users(
+    q: str = Query(..., min_length=3, max_length=100),
+    group: Optional[str] = None,
+    is_active: Optional[bool] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+    caller: str = Depends(require_scopes("users:read"))
+):
+    """
+    Поиск пользователей по части username, full_name, email или cn (автодополнение).
+    Доступно пользователю или сервисному клиенту со scope users:read.
+    
+    Подстрока ищется по триграммным GIN-индексам (поэтому минимум 3 символа),
+    пагинация - keyset по username (cursor = последний username предыдущей страницы).
+    """
+    pattern = "%" + q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+    
+    query = select(*_USER_PUBLIC_COLUMNS).where(
+        or_(
+            User.username.ilike(pattern),
+            User.full_name.ilike(pattern),
+            User.email.ilike(pattern),
+            User.cn.ilike(pattern)
+        )
+    )
+    
+    if group:
+        query = query.where(cast(User.groups, JSONB).contains([group]))
+    if is_active is not None:
+        query = query.where(User.is_active == is_active)
+    if cursor:
+        query = query.where(User.username > cursor)
+    
+    query = query.order_by(User.username).limit(limit + 1)
+    
+    with stage("db"):
+        result = await db.execute(query)
+        rows = result.all()
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = rows[-1].username
+    
+    return FastJSONResponse({
+        "items": [_user_public(row) for row in rows],
+        "next_cursor": next_cursor
+    })
@@ -0,0 +1,246 @@
+from fastapi import APIRouter, Depends, Form, HTTPException, Request, status
+from fastapi.security import HTTPBasic, HTTPBasicCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from typing import List, Optional, Tuple
+import logging
+
+from app.database.session import get_db
+from app.models.user import User
+from app.models.client import ServiceClient
+from app.schemas.client import (
+    ServiceClientCreate,
+    ServiceClientPublic,
+    ServiceClientSecret,
+    ClientCredentialsToken
+)
+from app.routers.auth import get_current_superuser
+from app.services.client_registry import (
+    client_registry,
+    generate_client_secret,
+    hash_client_secret,
+    ClientSecretError
+)
+from app.services.invalidation_bus import invalidation_bus, CLIENT
+from app.services.audit_service import audit_log
+from app.core.security import create_service_token
+from app.core.config import settings
+from app.core.responses import FastJSONResponse
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/auth", tags=["Service clients"])
+client_basic = HTTPBasic(auto_error=False)
+
+
+def _audit(request: Request, success: bool, client_id: Optional[str], detail: Optional[str] = None) -> None:
+    audit_log.record(
+        event_type="client_token",
+        success=success,
+        username=client_id,
+        client_ip=request.client.host if request.client else None,
+        user_agent=request.headers.get("user-agent"),
+        detail=detail
+    )
+
+
+def _oauth_error(status_code: int, error: str, description: str) -> FastJSONResponse:
+    """
+    Ошибка token endpoint в формате RFC 6749 (5.2).
+    """
+    headers = {"Cache-Control": "no-store"}
+    if status_code == status.HTTP_401_UNAUTHORIZED:
+        headers["WWW-Authenticate"] = "Basic"
+    return FastJSONResponse(
+        {"error": error, "error_description": description},
+        status_code=status_code,
+        headers=headers
+    )
+
+
+@router.post("/token", response_model=ClientCredentialsToken)
+async def client_credentials_token(
+    request: Request,
+    grant_type: str = Form(...),
+    scope: Optional[str] = Form(None),
+    client_id: Optional[str] = Form(None),
+    client_secret: Optional[str] = Form(None),
+    basic: Optional[HTTPBasicCredentials] = Depends(client_basic)
+):
+    """
+    Выдача токена сервисному клиенту (OAuth2 client_credentials).
+
+    Учетные данные клиента - в заголовке Authorization: Basic или в полях формы.
+    Если scope не указан, токен получает все разрешенные клиенту scope.
+    Refresh токен не выдается: клиент просто запрашивает новый токен.
+    """
+    if grant_type != "client_credentials":
+        return _oauth_error(
+            status.HTTP_400_BAD_REQUEST,
+            "unsupported_grant_type",
+            "Only client_credentials is supported"
+        )
+
+    if basic is not None:
+        client_id, client_secret = basic.username, basic.password
+
+    try:
+        valid, allowed = await client_registry.verify(client_id, client_secret)
+    except ClientSecretError:
+        return _oauth_error(
+            status.HTTP_503_SERVICE_UNAVAILABLE,
+            "temporarily_unavailable",
+            "Client verification is temporarily unavailable"
+        )
+    except Exception as e:
+        logger.error(f"Error verifying client {client_id}: {e}")
+        return _oauth_error(
+            status.HTTP_503_SERVICE_UNAVAILABLE,
+            "temporarily_unavailable",
+            "Client verification is temporarily unavailable"
+        )
+
+    if not valid:
+        _audit(request, False, client_id, detail="Invalid client credentials")
+        return _oauth_error(
+            status.HTTP_401_UNAUTHORIZED,
+            "invalid_client",
+            "Invalid client credentials"
+        )
+
+    requested = scope.split() if scope else allowed
+    denied = set(requested) - set(allowed)
+    if denied:
+        _audit(request, False, client_id, detail=f"Scope denied: {' '.join(sorted(denied))}")
+        return _oauth_error(
+            status.HTTP_400_BAD_REQUEST,
+            "invalid_scope",
+            f"Scope not allowed: {' '.join(sorted(denied))}"
+        )
+
+    granted = sorted(set(requested))
+    access_token = create_service_token(client_id, granted)
+    _audit(request, True, client_id)
+
+    return FastJSONResponse(
+        {
+            "access_token": access_token,
+            "token_type": "bearer",
+            "expires_in": settings.SERVICE_TOKEN_EXPIRE_MINUTES * 60,
+            "scope": " ".join(granted)
+        },
+        headers={"Cache-Control": "no-store"}
+    )
+
+
+async def _get_client(db: AsyncSession, client_id: str) -> ServiceClient:
+    result = await db.execute(
+        select(ServiceClient).where(ServiceClient.client_id == client_id)
+    )
+    client = result.scalar_one_or_none()
+    if client is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Client not found"
+        )
+    return client
+
+
+async def _new_secret() -> Tuple[str, str]:
+    secret = generate_client_secret()
+    try:
+        return secret, await hash_client_secret(secret)
+    except ClientSecretError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Не удалось сохранить секрет клиента"
+        )
+
+
+@router.get("/clients", response_model=List[ServiceClientPublic])
+async def list_clients(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_superuser)
+):
+    """
+    Список сервисных клиентов.
+    """
+    result = await db.execute(select(ServiceClient).order_by(ServiceClient.client_id))
+    return result.scalars().all()
+
+
+@router.post("/clients", response_model=ServiceClientSecret, status_code=status.HTTP_201_CREATED)
+async def create_client(
+    client_data: ServiceClientCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_superuser)
+):
+    """
+    Регистрация сервисного клиента. Секрет возвращается только в этом ответе.
+    """
+    secret, secret_hash = await _new_secret()
+    client = ServiceClient(
+        client_id=client_data.client_id,
+        secret_hash=secret_hash,
+        name=client_data.name,
+        scopes=sorted(set(client_data.scopes)),
+        is_active=True
+    )
+    db.add(client)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Client already exists"
+        )
+    await db.refresh(client)
+
+    logger.info(f"Service client {client.client_id} created by {current_user.username}")
+    return ServiceClientSecret(
+        **ServiceClientPublic.model_validate(client).model_dump(),
+        client_secret=secret
+    )
+
+
+@router.post("/clients/{client_id}/secret", response_model=ServiceClientSecret)
+async def rotate_client_secret(
+    client_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_superuser)
+):
+    """
+    Смена секрета. Старый секрет перестает приниматься сразу во всех воркерах;
+    уже выданные токены действуют до истечения срока.
+    """
+    client = await _get_client(db, client_id)
+    secret, client.secret_hash = await _new_secret()
+    await db.commit()
+    await db.refresh(client)
+    await invalidation_bus.invalidate(CLIENT, client_id)
+
+    logger.info(f"Service client {client_id} secret rotated by {current_user.username}")
+    return ServiceClientSecret(
+        **ServiceClientPublic.model_validate(client).model_dump(),
+        client_secret=secret
+    )
+
+
+@router.delete("/clients/{client_id}", response_model=ServiceClientPublic)
+async def disable_client(
+    client_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_superuser)
+):
+    """
+    Отключение клиента: новые токены не выдаются.
+    """
+    client = await _get_client(db, client_id)
+    client.is_active = False
+    await db.commit()
+    await db.refresh(client)
+    await invalidation_bus.invalidate(CLIENT, client_id)
+
+    logger.info(f"Service client {client_id} disabled by {current_user.username}")
+    return client
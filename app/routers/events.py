@@ -0,0 +1,46 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from typing import Optional
+import logging
+
+from app.routers.auth import require_scopes
+from app.services.user_events import user_events
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/auth/events", tags=["Events"])
+
+
+@router.get("/users")
+async def stream_user_events(
+    since: Optional[int] = Query(None, ge=0),
+    last_event_id: Optional[int] = Header(None),
+    caller: str = Depends(require_scopes("users:read"))
+):
+    """
+    Лента изменений пользователей (Server-Sent Events).
+    Доступно пользователю или сервисному клиенту со scope users:read.
+    
+    Продолжение с номера: параметр since или заголовок Last-Event-ID
+    (браузерный EventSource передает его автоматически при переподключении).
+    """
+    resume_from = since if since is not None else last_event_id
+    
+    try:
+        stream = await user_events.open_stream(resume_from)
+    except Exception as e:
+        logger.error(f"Error opening user events stream: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Лента событий временно недоступна",
+            headers={"Retry-After": "5"}
+        )
+    logger.info(f"User events stream opened by {caller} (since={resume_from})")
+    
+    return StreamingResponse(
+        stream,
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        }
+    )
@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Depends, Request, Response, status
+import logging
+
+from app.schemas.group import GroupDictionary
+from app.routers.auth import require_scopes, etag_matches
+from app.services.group_dictionary import group_dictionary
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/auth/groups", tags=["Groups"])
+
+
+@router.get("/dictionary", response_model=GroupDictionary)
+async def get_group_dictionary(
+    request: Request,
+    response: Response,
+    caller: str = Depends(require_scopes("groups:read"))
+):
+    """
+    Словарь групп для расшифровки claim "grp" в access токене.
+    Доступно пользователю или сервисному клиенту со scope groups:read.
+    
+    Словарь только дополняется, поэтому его можно кешировать и перечитывать,
+    лишь когда в токене встретится "gv" больше версии закешированного словаря.
+    """
+    version, groups = await group_dictionary.snapshot()
+    
+    etag = f'"groups.{version}"'
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=60"}
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    response.headers.update(headers)
+    return GroupDictionary(version=version, groups=groups)
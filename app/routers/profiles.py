@@ -0,0 +1,61 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import PlainTextResponse
+import logging
+
+from app.models.user import User
+from app.routers.auth import get_current_superuser
+from app.core.profiler import profile_store
+from app.core.responses import FastJSONResponse
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/auth/profiles", tags=["Profiler"])
+
+
+@router.get("")
+async def list_profiles(current_user: User = Depends(get_current_superuser)):
+    """
+    Профили медленных запросов, от новых к старым (без стеков).
+    Пусто, если PROFILER_ENABLED=false.
+    """
+    return FastJSONResponse({"items": profile_store.list()})
+
+
+@router.get("/{profile_id}")
+async def download_profile(
+    profile_id: int,
+    format: str = Query("json", pattern="^(json|folded)$"),
+    current_user: User = Depends(get_current_superuser)
+):
+    """
+    Скачивание профиля.
+
+    format=json - профиль целиком (этапы и стеки с количеством выборок);
+    format=folded - только стеки в формате "кадр;кадр N" для flamegraph.pl / speedscope.
+    """
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
+
+    if format == "folded":
+        body = "".join(f"{stack} {count}\n" for stack, count in profile["samples"].items())
+        return PlainTextResponse(
+            body,
+            headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.folded"'}
+        )
+
+    return FastJSONResponse(
+        profile,
+        headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.json"'}
+    )
+
+
+@router.delete("", status_code=status.HTTP_204_NO_CONTENT)
+async def clear_profiles(current_user: User = Depends(get_current_superuser)):
+    """
+    Очистка буфера профилей.
+    """
+    profile_store.clear()
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
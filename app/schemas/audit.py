@@ -0,0 +1,22 @@
+from pydantic import BaseModel, ConfigDict
+from typing import Optional, List
+from datetime import datetime
+
+
+class AuditEvent(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    created_at: datetime
+    event_type: str
+    success: bool
+    username: Optional[str] = None
+    client_ip: Optional[str] = None
+    user_agent: Optional[str] = None
+    detail: Optional[str] = None
+
+
+class AuditEventPage(BaseModel):
+    """Страница событий аудита. next_cursor передается в следующий запрос."""
+    items: List[AuditEvent]
+    next_cursor: Optional[str] = None
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 
 
 class Token(BaseModel):
@@ -19,11 +19,17 @@ class LoginRequest(BaseModel):
 
 class TokenValidationRequest(BaseModel):
     token: str
+    # Принимать токены сервисных клиентов (иначе для них valid=false)
+    allow_service: bool = False
 
 
 class TokenValidationResponse(BaseModel):
     valid: bool
     username: Optional[str] = None
+    # Для токенов сервисных клиентов (client_credentials)
+    token_type: Optional[str] = None
+    client_id: Optional[str] = None
+    scopes: List[str] = []
     message: Optional[str] = None
 
 
@@ -0,0 +1,32 @@
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Optional, List
+from datetime import datetime
+
+
+class ServiceClientCreate(BaseModel):
+    client_id: str = Field(..., pattern=r"^[A-Za-z0-9_.\-]{3,64}$")
+    name: Optional[str] = None
+    scopes: List[str] = []
+
+
+class ServiceClientPublic(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    client_id: str
+    name: Optional[str] = None
+    scopes: List[str] = []
+    is_active: bool
+    created_at: datetime
+    updated_at: datetime
+
+
+class ServiceClientSecret(ServiceClientPublic):
+    """Ответ при создании клиента / смене секрета. Секрет показывается один раз."""
+    client_secret: str
+
+
+class ClientCredentialsToken(BaseModel):
+    access_token: str
+    token_type: str = "bearer"
+    expires_in: int
+    scope: str
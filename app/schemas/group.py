@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+from typing import Dict
+
+
+class GroupDictionary(BaseModel):
+    """
+    Словарь групп для расшифровки claim "grp" в access токене.
+    Токен с "gv" <= version расшифровывается этим словарем.
+    """
+    version: int
+    groups: Dict[int, str]
@@ -45,3 +45,9 @@ class UserPublic(BaseModel):
     groups: List[str] = []
     is_active: bool
 
+
+
+class UserSearchPage(BaseModel):
+    """Страница результатов поиска. next_cursor передается в следующий запрос."""
+    items: List[UserPublic]
+    next_cursor: Optional[str] = None
@@ -0,0 +1,225 @@
+from collections import deque
+from datetime import datetime
+from typing import Optional, Dict, List, Set, Tuple
+import asyncio
+import logging
+
+from sqlalchemy import insert, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+from app.models.audit import AuthAuditEvent
+
+logger = logging.getLogger(__name__)
+
+# Колонки для COPY (id заполняется последовательностью)
+_COPY_COLUMNS = ("created_at", "event_type", "success", "username", "client_ip", "user_agent", "detail")
+
+
+def _month_bounds(moment: datetime) -> Tuple[datetime, datetime]:
+    start = datetime(moment.year, moment.month, 1)
+    if moment.month == 12:
+        end = datetime(moment.year + 1, 1, 1)
+    else:
+        end = datetime(moment.year, moment.month + 1, 1)
+    return start, end
+
+
+class AuditLog:
+    """
+    Асинхронный журнал аудита аутентификации.
+
+    События складываются в ограниченный буфер в памяти (без обращения к БД
+    в обработчике запроса), фоновая задача пачками пишет их в секционированную
+    таблицу auth_audit_events. При переполнении буфера новые события
+    отбрасываются и учитываются в счетчике dropped.
+    """
+
+    def __init__(
+        self,
+        enabled: bool,
+        buffer_size: int,
+        batch_size: int,
+        flush_interval: float
+    ):
+        self.enabled = enabled
+        self.buffer_size = buffer_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._buffer: deque = deque()
+        self._engine: Optional[AsyncEngine] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._partitions: Set[datetime] = set()
+
+        # Счетчики
+        self.recorded = 0
+        self.written = 0
+        self.dropped = 0
+        self.flush_errors = 0
+
+    def record(
+        self,
+        event_type: str,
+        success: bool,
+        username: Optional[str] = None,
+        client_ip: Optional[str] = None,
+        user_agent: Optional[str] = None,
+        detail: Optional[str] = None
+    ) -> None:
+        """
+        Добавление события в буфер. Никогда не блокирует и не бросает исключений.
+        """
+        if not self.enabled:
+            return
+
+        if len(self._buffer) >= self.buffer_size:
+            self.dropped += 1
+            return
+
+        self._buffer.append({
+            "created_at": datetime.utcnow(),
+            "event_type": event_type,
+            "success": success,
+            "username": username,
+            "client_ip": client_ip,
+            "user_agent": user_agent,
+            "detail": detail,
+        })
+        self.recorded += 1
+
+        if self._wakeup is not None and len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    async def ensure_partition(self, conn, moment: datetime) -> datetime:
+        """
+        Создание месячной секции, в которую попадает moment.
+        Возвращает начало месяца секции.
+        """
+        start, end = _month_bounds(moment)
+        if start in self._partitions:
+            return start
+
+        table = AuthAuditEvent.__tablename__
+        await conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {table}_{start:%Y_%m} "
+            f"PARTITION OF {table} "
+            f"FOR VALUES FROM ('{start:%Y-%m-%d}') TO ('{end:%Y-%m-%d}')"
+        ))
+        return start
+
+    async def ensure_partitions(self, conn) -> None:
+        """
+        Секции на текущий и следующий месяц плюс секция по умолчанию.
+        """
+        table = AuthAuditEvent.__tablename__
+        await conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {table}_default PARTITION OF {table} DEFAULT"
+        ))
+        now = datetime.utcnow()
+        for moment in (now, _month_bounds(now)[1]):
+            await self.ensure_partition(conn, moment)
+
+    def _take_batch(self) -> List[Dict]:
+        batch = []
+        while self._buffer and len(batch) < self.batch_size:
+            batch.append(self._buffer.popleft())
+        return batch
+
+    def _requeue(self, batch: List[Dict]) -> None:
+        # Возвращаем пачку в начало буфера, лишнее отбрасываем
+        free = self.buffer_size - len(self._buffer)
+        if free < len(batch):
+            self.dropped += len(batch) - max(free, 0)
+            batch = batch[:max(free, 0)]
+        self._buffer.extendleft(reversed(batch))
+
+    async def _write_batch(self, conn, batch: List[Dict]) -> None:
+        """
+        Запись пачки одной командой: COPY через asyncpg, для других драйверов -
+        один многострочный INSERT (executemany asyncpg без RETURNING
+        выполнял бы INSERT построчно).
+        """
+        if conn.dialect.driver == "asyncpg":
+            raw = await conn.get_raw_connection()
+            await raw.driver_connection.copy_records_to_table(
+                AuthAuditEvent.__tablename__,
+                records=[tuple(row[column] for column in _COPY_COLUMNS) for row in batch],
+                columns=_COPY_COLUMNS
+            )
+        else:
+            await conn.execute(insert(AuthAuditEvent).values(batch))
+
+    async def flush(self) -> int:
+        """
+        Запись накопленных событий в БД пачками по batch_size.
+        """
+        if self._engine is None:
+            return 0
+
+        flushed = 0
+        while self._buffer:
+            batch = self._take_batch()
+            try:
+                async with self._engine.begin() as conn:
+                    partitions = {
+                        await self.ensure_partition(conn, row["created_at"])
+                        for row in batch
+                    }
+                    await self._write_batch(conn, batch)
+                self._partitions.update(partitions)
+            except Exception as e:
+                self.flush_errors += 1
+                logger.error(f"Error writing audit events: {e}")
+                self._requeue(batch)
+                break
+            flushed += len(batch)
+            self.written += len(batch)
+        return flushed
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def start(self, engine: AsyncEngine) -> None:
+        if not self.enabled or self._task is not None:
+            return
+        self._engine = engine
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        logger.info("Audit log writer started")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        # Дописываем остаток буфера
+        await self.flush()
+        logger.info("Audit log writer stopped")
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "buffered": len(self._buffer),
+            "recorded": self.recorded,
+            "written": self.written,
+            "dropped": self.dropped,
+            "flush_errors": self.flush_errors,
+        }
+
+
+audit_log = AuditLog(
+    enabled=settings.AUDIT_ENABLED,
+    buffer_size=settings.AUDIT_BUFFER_SIZE,
+    batch_size=settings.AUDIT_BATCH_SIZE,
+    flush_interval=settings.AUDIT_FLUSH_INTERVAL_SECONDS
+)
@@ -0,0 +1,171 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, List, Tuple
+import hashlib
+import hmac
+import secrets
+import threading
+import time
+import logging
+
+from sqlalchemy import select
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.security import pwd_context
+from app.database.session import AsyncSessionLocal
+from app.models.client import ServiceClient
+from app.services.invalidation_bus import invalidation_bus, CLIENT
+from app.services.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+class ClientSecretError(Exception):
+    """Ошибка хеширования/проверки секрета (bcrypt недоступен)."""
+    pass
+
+
+@dataclass
+class _VerifiedClient:
+    fingerprint: str  # HMAC-SHA256 секрета, не сам секрет
+    scopes: List[str]
+    verified_at: float
+
+
+def generate_client_secret() -> str:
+    return secrets.token_urlsafe(32)
+
+
+async def hash_client_secret(secret: str) -> str:
+    try:
+        return await run_in_threadpool(pwd_context.hash, secret)
+    except Exception as e:
+        logger.error(f"Client secret hash error: {e}")
+        raise ClientSecretError(str(e))
+
+
+class ClientRegistry:
+    """
+    Проверка учетных данных сервисных клиентов.
+
+    Секреты хранятся в БД как bcrypt-хеш. После успешной проверки клиент
+    кешируется в памяти воркера вместе с HMAC секрета: повторная выдача
+    токена в пределах TTL сравнивает HMAC и не обращается ни к БД, ни к bcrypt.
+    При смене секрета или отключении клиента запись сбрасывается во всех
+    воркерах через шину инвалидации.
+    """
+
+    def __init__(self, ttl_seconds: int, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, _VerifiedClient]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _fingerprint(client_id: str, secret: str) -> str:
+        return hmac.new(
+            settings.SECRET_KEY.encode(),
+            f"{client_id}:{secret}".encode(),
+            hashlib.sha256
+        ).hexdigest()
+
+    def _get_cached(self, client_id: str, fingerprint: str) -> Optional[List[str]]:
+        with self._lock:
+            entry = self._entries.get(client_id)
+            if entry is None:
+                return None
+            if time.monotonic() - entry.verified_at > self.ttl_seconds:
+                del self._entries[client_id]
+                return None
+            if not hmac.compare_digest(entry.fingerprint, fingerprint):
+                return None
+            self._entries.move_to_end(client_id)
+            return list(entry.scopes)
+
+    def _store(self, client_id: str, fingerprint: str, scopes: List[str]) -> None:
+        with self._lock:
+            self._entries[client_id] = _VerifiedClient(
+                fingerprint=fingerprint,
+                scopes=list(scopes),
+                verified_at=time.monotonic()
+            )
+            self._entries.move_to_end(client_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    async def _verify_in_db(self, client_id: str, secret: str, fingerprint: str) -> Optional[List[str]]:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(ServiceClient.secret_hash, ServiceClient.scopes, ServiceClient.is_active)
+                .where(ServiceClient.client_id == client_id)
+            )
+            row = result.one_or_none()
+
+        if row is None or not row.is_active:
+            return None
+
+        # bcrypt намеренно медленный - выполняем вне event loop
+        try:
+            valid = await run_in_threadpool(pwd_context.verify, secret, row.secret_hash)
+        except Exception as e:
+            logger.error(f"Client secret verify error for {client_id}: {e}")
+            raise ClientSecretError(str(e))
+        if not valid:
+            return None
+
+        scopes = list(row.scopes or [])
+        self._store(client_id, fingerprint, scopes)
+        return scopes
+
+    async def verify(self, client_id: str, secret: str) -> Tuple[bool, List[str]]:
+        """
+        Проверка client_id/secret.
+
+        Returns:
+            (успех, разрешенные scope клиента)
+        """
+        if not client_id or not secret:
+            return False, []
+
+        fingerprint = self._fingerprint(client_id, secret)
+        scopes = self._get_cached(client_id, fingerprint)
+        if scopes is not None:
+            self.hits += 1
+            return True, scopes
+
+        self.misses += 1
+        # Одновременные запросы одного клиента проверяются одним вызовом bcrypt
+        scopes = await self._flight.do(
+            fingerprint,
+            lambda: self._verify_in_db(client_id, secret, fingerprint)
+        )
+        if scopes is None:
+            return False, []
+        return True, scopes
+
+    def invalidate(self, client_id: str) -> None:
+        """
+        Удаление записи (смена секрета, изменение scope, отключение клиента).
+        """
+        with self._lock:
+            if self._entries.pop(client_id, None) is not None:
+                logger.info(f"Client cache invalidated for {client_id}")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        return {"cached": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+client_registry = ClientRegistry(
+    ttl_seconds=settings.CLIENT_CACHE_TTL_SECONDS,
+    max_entries=settings.CLIENT_CACHE_MAX_ENTRIES
+)
+
+invalidation_bus.register(CLIENT, client_registry.invalidate, client_registry.clear)
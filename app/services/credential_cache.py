@@ -0,0 +1,147 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Dict
+import threading
+import time
+import logging
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.security import pwd_context
+from app.services.invalidation_bus import invalidation_bus, USER
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _CachedCredential:
+    verifier: str  # bcrypt-хеш пароля
+    ldap_data: Dict
+    verified_at: float
+
+
+class CredentialCache:
+    """
+    Кеш успешно проверенных через LDAP учетных данных.
+
+    Хранит bcrypt-хеш пароля и данные пользователя из LDAP.
+    В течение TTL повторный вход проверяется локально, без BIND к AD.
+    При недоступности контроллера домена запись может использоваться
+    до истечения OUTAGE_TTL (деградированный режим).
+    """
+
+    def __init__(
+        self,
+        enabled: bool,
+        ttl_seconds: int,
+        outage_ttl_seconds: int,
+        max_entries: int
+    ):
+        self.enabled = enabled
+        self.ttl_seconds = ttl_seconds
+        self.outage_ttl_seconds = max(outage_ttl_seconds, ttl_seconds)
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, _CachedCredential]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(username: str) -> str:
+        return username.strip().lower()
+
+    def _get_entry(self, username: str, max_age: int) -> Optional[_CachedCredential]:
+        key = self._key(username)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            age = time.monotonic() - entry.verified_at
+            if age > self.outage_ttl_seconds:
+                del self._entries[key]
+                return None
+            if age > max_age:
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    async def _verify(self, username: str, password: str, max_age: int) -> Optional[Dict]:
+        if not self.enabled or not password:
+            return None
+
+        entry = self._get_entry(username, max_age)
+        if entry is None:
+            return None
+
+        # bcrypt намеренно медленный - выполняем вне event loop
+        try:
+            if await run_in_threadpool(pwd_context.verify, password, entry.verifier):
+                return dict(entry.ldap_data)
+        except Exception as e:
+            logger.error(f"Credential cache verify error: {e}")
+        return None
+
+    async def verify(self, username: str, password: str) -> Optional[Dict]:
+        """
+        Проверка пароля по кешу в пределах обычного TTL.
+
+        Returns:
+            Данные пользователя из LDAP или None (нет записи / неверный пароль)
+        """
+        return await self._verify(username, password, self.ttl_seconds)
+
+    async def verify_during_outage(self, username: str, password: str) -> Optional[Dict]:
+        """
+        Проверка пароля по кешу при недоступности LDAP (расширенный TTL).
+        """
+        ldap_data = await self._verify(username, password, self.outage_ttl_seconds)
+        if ldap_data:
+            logger.warning(f"⚠️ LDAP unavailable, user {username} verified from credential cache")
+        return ldap_data
+
+    async def store(self, username: str, password: str, ldap_data: Dict) -> None:
+        """
+        Сохранение учетных данных после успешного BIND.
+        """
+        if not self.enabled or not password:
+            return
+
+        try:
+            verifier = await run_in_threadpool(pwd_context.hash, password)
+        except Exception as e:
+            logger.error(f"Credential cache hash error: {e}")
+            return
+        entry = _CachedCredential(
+            verifier=verifier,
+            ldap_data=dict(ldap_data),
+            verified_at=time.monotonic()
+        )
+
+        key = self._key(username)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, username: str) -> None:
+        """
+        Удаление записи (блокировка пользователя, смена пароля).
+        """
+        with self._lock:
+            if self._entries.pop(self._key(username), None) is not None:
+                logger.info(f"Credential cache invalidated for user {username}")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+credential_cache = CredentialCache(
+    enabled=settings.CREDENTIAL_CACHE_ENABLED,
+    ttl_seconds=settings.CREDENTIAL_CACHE_TTL_SECONDS,
+    outage_ttl_seconds=settings.CREDENTIAL_CACHE_OUTAGE_TTL_SECONDS,
+    max_entries=settings.CREDENTIAL_CACHE_MAX_ENTRIES
+)
+
+# Блокировка / смена пароля, обнаруженная другим воркером
+invalidation_bus.register(USER, credential_cache.invalidate, credential_cache.clear)
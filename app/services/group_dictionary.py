@@ -0,0 +1,139 @@
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import asyncio
+import base64
+import logging
+
+from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.database.session import AsyncSessionLocal
+from app.models.group import LdapGroup
+from app.services.invalidation_bus import invalidation_bus, GROUP
+
+logger = logging.getLogger(__name__)
+
+# Ключ pg_advisory_xact_lock для регистрации новых групп
+REGISTRATION_LOCK_ID = 7_201_033
+
+
+def encode_group_bitset(group_ids: Iterable[int]) -> str:
+    """
+    Битовое множество ID групп: бит N (little-endian) = группа с ID N.
+    Кодируется base64url без выравнивания.
+    """
+    value = 0
+    for group_id in group_ids:
+        value |= 1 << group_id
+    raw = value.to_bytes((value.bit_length() + 7) // 8, "little")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_group_bitset(encoded: str) -> Set[int]:
+    raw = base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4))
+    value = int.from_bytes(raw, "little")
+    result = set()
+    group_id = 0
+    while value:
+        if value & 1:
+            result.add(group_id)
+        value >>= 1
+        group_id += 1
+    return result
+
+
+def has_group(encoded: str, group_id: int) -> bool:
+    """
+    Проверка членства - один битовый тест, без полного разбора.
+    """
+    raw = base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4))
+    index, bit = divmod(group_id, 8)
+    return index < len(raw) and bool(raw[index] & (1 << bit))
+
+
+class GroupDictionary:
+    """
+    Версионируемый словарь групп (кеш таблицы ldap_groups в памяти воркера).
+    Новые DN добавляются при входе пользователя; остальные воркеры узнают
+    об этом через шину инвалидации и перечитывают словарь.
+    """
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._dns: Dict[int, str] = {}
+        self._loaded = False
+        self._lock = asyncio.Lock()
+
+    @property
+    def version(self) -> int:
+        """
+        Версия словаря - максимальный ID. Это корректно, потому что
+        регистрация сериализована advisory lock-ом: ID выдаются и фиксируются
+        в одном порядке, и строка с ID N видна только вместе со всеми ID < N.
+        """
+        return max(self._dns, default=0)
+
+    def mark_stale(self, key: Optional[str] = None) -> None:
+        self._loaded = False
+
+    async def _load(self, db) -> None:
+        result = await db.execute(select(LdapGroup.id, LdapGroup.dn))
+        rows = result.all()
+        self._ids = {row.dn: row.id for row in rows}
+        self._dns = {row.id: row.dn for row in rows}
+        self._loaded = True
+
+    async def ensure_ids(self, dns: List[str]) -> Tuple[List[int], int]:
+        """
+        ID для списка DN (неизвестные DN регистрируются).
+
+        Returns:
+            (список ID, версия словаря)
+        """
+        if self._loaded and all(dn in self._ids for dn in dns):
+            return [self._ids[dn] for dn in dns], self.version
+
+        async with self._lock:
+            async with AsyncSessionLocal() as db:
+                if not self._loaded:
+                    await self._load(db)
+
+                missing = sorted(set(dn for dn in dns if dn not in self._ids))
+                if missing:
+                    # Без блокировки воркер A может получить id 10, воркер B - id 11
+                    # и зафиксировать первым: читатель увидит версию 11 без группы 10.
+                    # Блокировка снимается при commit, поэтому порядок фиксации
+                    # совпадает с порядком выдачи ID.
+                    await db.execute(select(func.pg_advisory_xact_lock(REGISTRATION_LOCK_ID)))
+                    await db.execute(
+                        pg_insert(LdapGroup)
+                        .values([{"dn": dn} for dn in missing])
+                        .on_conflict_do_nothing(index_elements=["dn"])
+                    )
+                    await db.commit()
+                    await self._load(db)
+                    logger.info(f"Registered {len(missing)} new LDAP groups, dictionary version {self.version}")
+
+            if missing:
+                await invalidation_bus.invalidate(GROUP, "dictionary", local=False)
+
+        return [self._ids[dn] for dn in dns if dn in self._ids], self.version
+
+    async def snapshot(self) -> Tuple[int, Dict[int, str]]:
+        if not self._loaded:
+            async with self._lock:
+                if not self._loaded:
+                    async with AsyncSessionLocal() as db:
+                        await self._load(db)
+        return self.version, dict(self._dns)
+
+    async def token_claims(self, dns: List[str]) -> Dict:
+        """
+        Claims для access токена: "grp" - битовое множество групп, "gv" - версия словаря.
+        """
+        group_ids, version = await self.ensure_ids(dns)
+        return {"grp": encode_group_bitset(group_ids), "gv": version}
+
+
+group_dictionary = GroupDictionary()
+
+invalidation_bus.register(GROUP, group_dictionary.mark_stale, group_dictionary.mark_stale)
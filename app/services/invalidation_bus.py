@@ -0,0 +1,188 @@
+from typing import AsyncIterator, Callable, Dict, List, Optional
+import asyncio
+import json
+import logging
+import os
+import uuid
+
+from app.core.config import settings
+from app.database.redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "auth:invalidations"
+
+# Пространства ключей локальных кешей
+USER = "user"
+TOKEN = "token"
+GROUP = "group"
+CLIENT = "client"
+
+
+class LocalTransport:
+    """
+    Транспорт внутри одного процесса (тесты, запуск с одним воркером).
+    """
+
+    def __init__(self):
+        self._queues: List[asyncio.Queue] = []
+
+    async def publish(self, message: str) -> None:
+        for queue in self._queues:
+            queue.put_nowait(message)
+
+    async def subscribe(self) -> AsyncIterator[str]:
+        queue: asyncio.Queue = asyncio.Queue()
+        self._queues.append(queue)
+        return self._iterate(queue)
+
+    async def _iterate(self, queue: asyncio.Queue) -> AsyncIterator[str]:
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self._queues.remove(queue)
+
+
+class RedisTransport:
+    """
+    Транспорт через Redis pub/sub (несколько воркеров / экземпляров).
+
+    Если сообщений нет keepalive секунд, по соединению подписки отправляется
+    PING. Нет ответа и за следующий интервал - соединение считается потерянным
+    (обрыв без RST не дает ошибки чтения), шина переподключается и сбрасывает кеши.
+    """
+
+    def __init__(self, keepalive: float = 30.0):
+        self.keepalive = keepalive
+
+    async def publish(self, message: str) -> None:
+        await redis_client.publish(CHANNEL, message)
+
+    async def subscribe(self) -> AsyncIterator[str]:
+        pubsub = redis_client.pubsub()
+        await pubsub.subscribe(CHANNEL)
+        return self._iterate(pubsub)
+
+    async def _iterate(self, pubsub) -> AsyncIterator[str]:
+        try:
+            ping_sent = False
+            while True:
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=self.keepalive)
+                if message is None:
+                    if ping_sent:
+                        raise ConnectionError("Redis pub/sub connection did not answer PING")
+                    await pubsub.ping()
+                    ping_sent = True
+                    continue
+                ping_sent = False
+                if message["type"] == "message":
+                    yield message["data"]
+        finally:
+            await pubsub.aclose()
+
+
+class InvalidationBus:
+    """
+    Шина инвалидации локальных кешей между воркерами.
+
+    Кеш регистрирует обработчик для своего пространства ключей (user, token,
+    group, client) и функцию полного сброса. invalidate() применяется локально сразу
+    и рассылается остальным воркерам. После потери соединения с транспортом
+    часть сообщений могла быть пропущена, поэтому при переподключении
+    все зарегистрированные кеши сбрасываются целиком.
+    """
+
+    def __init__(self, transport, reconnect_delay: float = 1.0):
+        self.transport = transport
+        self.reconnect_delay = reconnect_delay
+        self.worker_id = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._handlers: Dict[str, List[Callable[[str], None]]] = {}
+        self._resync_handlers: List[Callable[[], None]] = []
+        self._task: Optional[asyncio.Task] = None
+        self.received = 0
+        self.resyncs = 0
+
+    def register(
+        self,
+        namespace: str,
+        handler: Callable[[str], None],
+        resync: Callable[[], None]
+    ) -> None:
+        self._handlers.setdefault(namespace, []).append(handler)
+        self._resync_handlers.append(resync)
+
+    def _apply(self, namespace: str, key: str) -> None:
+        for handler in self._handlers.get(namespace, []):
+            try:
+                handler(key)
+            except Exception as e:
+                logger.error(f"Invalidation handler error ({namespace}:{key}): {e}")
+
+    def _resync(self) -> None:
+        self.resyncs += 1
+        for resync in self._resync_handlers:
+            try:
+                resync()
+            except Exception as e:
+                logger.error(f"Cache resync error: {e}")
+        logger.warning("Invalidation bus reconnected, local caches flushed")
+
+    async def invalidate(self, namespace: str, key: str, local: bool = True) -> None:
+        """
+        Инвалидация ключа во всех воркерах.
+        local=False - только в остальных воркерах (свой кеш уже актуален).
+        """
+        if local:
+            self._apply(namespace, key)
+
+        message = json.dumps({"ns": namespace, "key": key, "origin": self.worker_id})
+        try:
+            await self.transport.publish(message)
+        except Exception as e:
+            logger.error(f"Error publishing invalidation {namespace}:{key}: {e}")
+
+    async def _run(self) -> None:
+        disconnected = False
+        while True:
+            try:
+                messages = await self.transport.subscribe()
+                if disconnected:
+                    self._resync()
+                    disconnected = False
+
+                async for raw in messages:
+                    message = json.loads(raw)
+                    if message.get("origin") == self.worker_id:
+                        continue
+                    self.received += 1
+                    self._apply(message["ns"], message["key"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if not disconnected:
+                    logger.error(f"Invalidation bus disconnected: {e}")
+                disconnected = True
+                await asyncio.sleep(self.reconnect_delay)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def stats(self) -> Dict[str, int]:
+        return {"received": self.received, "resyncs": self.resyncs}
+
+
+invalidation_bus = InvalidationBus(
+    RedisTransport() if settings.INVALIDATION_BUS == "redis" else LocalTransport()
+)
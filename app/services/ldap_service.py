@@ -1,10 +1,12 @@
-from ldap3 import Server, Connection, SUBTREE, ALL
+from ldap3 import Server, Connection, SUBTREE, BASE, ALL
+from ldap3.utils.conv import escape_filter_chars
 from ldap3.core.exceptions import (
     LDAPBindError, 
     LDAPInvalidCredentialsResult,
+    LDAPCommunicationError,
     LDAPException
 )
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Tuple
 import logging
 
 from app.core.config import settings
@@ -12,6 +14,52 @@ from app.core.config import settings
 logger = logging.getLogger(__name__)
 
 
+# Атрибут LDAP -> ключ в данных пользователя
+ATTRIBUTE_MAP = {
+    'sAMAccountName': 'username',
+    'mail': 'email',
+    'displayName': 'full_name',
+    'cn': 'cn',
+    'memberOf': 'groups',
+    'department': 'department',
+    'title': 'title',
+    'telephoneNumber': 'phone',
+}
+MULTI_VALUED_ATTRIBUTES = {'memberOf'}
+
+
+def _extract_attribute(entry_attributes: Dict, attribute: str) -> Tuple[List[str], Optional[int]]:
+    """
+    Значения атрибута из ответа поиска и начало следующего диапазона.
+    
+    Returns:
+        (значения, low следующего диапазона или None, если получено все)
+    """
+    for name, value in entry_attributes.items():
+        base, _, options = name.partition(';')
+        if base.lower() != attribute.lower():
+            continue
+        
+        if value is None:
+            values = []
+        elif isinstance(value, (list, tuple)):
+            values = [str(v) for v in value]
+        else:
+            values = [str(value)]
+        if options.lower().startswith('range='):
+            high = options.split('=', 1)[1].split('-', 1)[1]
+            return values, None if high == '*' else int(high) + 1
+        return values, None
+    
+    return [], None
+
+
+class LDAPUnavailableError(Exception):
+    """
+    Контроллер домена недоступен (ошибка соединения, а не неверный пароль).
+    """
+
+
 class LDAPService:
     def __init__(self):
         self.server = Server(
@@ -20,12 +68,21 @@ class LDAPService:
             get_info=ALL
         )
     
-    def authenticate(self, username: str, password: str) -> Optional[Dict]:
+    def authenticate(
+        self,
+        username: str,
+        password: str,
+        attributes: Optional[List[str]] = None
+    ) -> Optional[Dict]:
         """
         Аутентификация пользователя через LDAP и получение его данных.
+        attributes - набор атрибутов LDAP (по умолчанию LDAP_USER_ATTRIBUTES).
         
         Returns:
             Dict с данными пользователя или None если аутентификация не удалась
+
+        Raises:
+            LDAPUnavailableError: если LDAP сервер недоступен
         """
         if not password:
             logger.warning(f"Empty password provided for user {username}")
@@ -40,13 +97,18 @@ class LDAPService:
                 self.server,
                 user=user_principal,
                 password=password,
-                auto_bind=True
+                auto_bind=True,
+                # Диапазоны дочитываем сами, см. _get_attribute_values.
+                # Без return_empty_attributes=False ldap3 при auto_range=False
+                # падает с KeyError на ответах "memberOf;range=N-*"
+                auto_range=False,
+                return_empty_attributes=False
             )
             
             logger.info(f"✅ User {username} authenticated successfully")
             
             # Получаем данные пользователя
-            user_data = self._get_user_data(conn, username)
+            user_data = self._get_user_data(conn, username, attributes)
             
             conn.unbind()
             return user_data
@@ -54,6 +116,9 @@ class LDAPService:
         except LDAPInvalidCredentialsResult:
             logger.warning(f"❌ Invalid credentials for user {username}")
             return None
+        except LDAPCommunicationError as e:
+            logger.error(f"❌ LDAP server unavailable: {e}")
+            raise LDAPUnavailableError(str(e)) from e
         except LDAPBindError as e:
             logger.error(f"❌ LDAP bind error for user {username}: {e}")
             return None
@@ -64,21 +129,23 @@ class LDAPService:
             logger.error(f"❌ Unexpected error during authentication: {e}")
             return None
     
-    def _get_user_data(self, conn: Connection, username: str) -> Optional[Dict]:
+    def _get_user_data(
+        self,
+        conn: Connection,
+        username: str,
+        attributes: Optional[List[str]] = None
+    ) -> Optional[Dict]:
         """
         Получение данных пользователя из LDAP.
+        
+        Запрашиваются только атрибуты из attributes
+        (по умолчанию - LDAP_USER_ATTRIBUTES). Многозначные атрибуты,
+        которые AD отдает частями (memberOf;range=0-1499), дочитываются целиком.
         """
-        search_filter = f'(sAMAccountName={username})'
-        attributes = [
-            'cn', 
-            'mail', 
-            'displayName', 
-            'sAMAccountName',
-            'memberOf',
-            'department',
-            'title',
-            'telephoneNumber'
-        ]
+        search_filter = f'(sAMAccountName={escape_filter_chars(username)})'
+        attributes = list(attributes or settings.ldap_user_attributes_list)
+        if 'sAMAccountName' not in attributes:
+            attributes.append('sAMAccountName')
         
         try:
             conn.search(
@@ -88,35 +155,80 @@ class LDAPService:
                 attributes=attributes
             )
             
-            if not conn.entries:
+            entries = [
+                entry for entry in conn.response or []
+                if entry.get('type') == 'searchResEntry'
+            ]
+            if not entries:
                 logger.warning(f"User {username} not found in LDAP")
                 return None
             
-            user_entry = conn.entries[0]
-            
-            # Обрабатываем группы
-            groups = []
-            if hasattr(user_entry, 'memberOf'):
-                groups = [str(group) for group in user_entry.memberOf]
-            
+            user_entry = entries[0]
             user_data = {
-                'username': str(user_entry.sAMAccountName),
-                'email': str(user_entry.mail) if hasattr(user_entry, 'mail') else None,
-                'full_name': str(user_entry.displayName) if hasattr(user_entry, 'displayName') else None,
-                'cn': str(user_entry.cn) if hasattr(user_entry, 'cn') else None,
-                'department': str(user_entry.department) if hasattr(user_entry, 'department') else None,
-                'title': str(user_entry.title) if hasattr(user_entry, 'title') else None,
-                'phone': str(user_entry.telephoneNumber) if hasattr(user_entry, 'telephoneNumber') else None,
-                'groups': groups,
+                'username': None,
+                'email': None,
+                'full_name': None,
+                'cn': None,
+                'groups': [],
             }
             
-            logger.info(f"Retrieved data for user {username}: {user_data['full_name']}")
+            for attribute in attributes:
+                key = ATTRIBUTE_MAP.get(attribute)
+                if key is None:
+                    continue
+                values = self._get_attribute_values(
+                    conn,
+                    user_entry['dn'],
+                    user_entry['attributes'],
+                    attribute
+                )
+                if attribute in MULTI_VALUED_ATTRIBUTES:
+                    user_data[key] = values
+                else:
+                    user_data[key] = values[0] if values else None
+            
+            logger.info(
+                f"Retrieved data for user {username}: {user_data['full_name']} "
+                f"({len(user_data['groups'])} groups)"
+            )
             return user_data
             
         except Exception as e:
             logger.error(f"Error getting user data: {e}")
             return None
     
+    def _get_attribute_values(
+        self,
+        conn: Connection,
+        dn: str,
+        entry_attributes: Dict,
+        attribute: str
+    ) -> List[str]:
+        """
+        Значения атрибута с дочитыванием диапазонов (attribute;range=low-high).
+        """
+        values, next_low = _extract_attribute(entry_attributes, attribute)
+        
+        while next_low is not None:
+            conn.search(
+                search_base=dn,
+                search_filter='(objectClass=*)',
+                search_scope=BASE,
+                attributes=[f'{attribute};range={next_low}-*']
+            )
+            entries = [
+                entry for entry in conn.response or []
+                if entry.get('type') == 'searchResEntry'
+            ]
+            if not entries:
+                logger.warning(f"Range retrieval of {attribute} for {dn} stopped at {next_low}")
+                break
+            
+            chunk, next_low = _extract_attribute(entries[0]['attributes'], attribute)
+            values.extend(chunk)
+        
+        return values
+    
     def check_group_membership(self, groups: List[str], required_group: str) -> bool:
         """
         Проверка принадлежности к группе.
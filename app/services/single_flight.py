@@ -0,0 +1,46 @@
+from typing import Awaitable, Callable, Dict, TypeVar
+import asyncio
+import logging
+
+from app.core.profiler import follow_task, spawn_shared
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Объединение одновременных одинаковых вызовов.
+
+    Пока выполняется вызов с ключом key, все остальные вызовы с тем же
+    ключом не запускают func повторно, а ждут и получают тот же результат
+    (или то же исключение).
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Task] = {}
+
+    async def do(self, key: str, func: Callable[[], Awaitable[T]]) -> T:
+        task = self._calls.get(key)
+        if task is None:
+            # Отдельная задача: отмена одного запроса не отменяет остальные
+            task = spawn_shared(func())
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+        else:
+            logger.debug("Joined in-flight call")
+
+        # Профилировщик видит работу общей задачи у каждого ожидающего
+        follow_task(task)
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Забираем исключение, если все ожидающие были отменены
+        if not task.cancelled():
+            task.exception()
+
+    def in_flight(self) -> int:
+        return len(self._calls)
@@ -0,0 +1,148 @@
+from typing import AsyncIterator, Dict, List, Optional
+import json
+import logging
+
+from app.core.config import settings
+from app.database.redis import redis_client
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+SEQUENCE_KEY = "auth:user_events:seq"
+BACKLOG_KEY = "auth:user_events:log"
+CHANNEL = "auth:user_events"
+
+# Атомарно: номер события, запись в журнал (ограниченный по размеру), публикация.
+# Порядок номеров совпадает с порядком публикации.
+_PUBLISH_SCRIPT = """
+local seq = redis.call('INCR', KEYS[1])
+local event = cjson.decode(ARGV[1])
+event['seq'] = seq
+local payload = cjson.encode(event)
+redis.call('ZADD', KEYS[2], seq, payload)
+redis.call('ZREMRANGEBYRANK', KEYS[2], 0, -(tonumber(ARGV[2]) + 1))
+redis.call('PUBLISH', KEYS[3], payload)
+return seq
+"""
+
+
+def _format_sse(event_type: str, data: Dict, event_id: Optional[int] = None) -> str:
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event_type}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+
+class UserEventFeed:
+    """
+    Лента изменений пользователей.
+
+    Каждое изменение (вход с новыми данными из LDAP, синхронизация,
+    действия администратора) получает монотонно растущий номер, сохраняется
+    в ограниченном журнале Redis и рассылается через pub/sub.
+    Потребители читают ленту как Server-Sent Events и могут продолжить
+    с последнего полученного номера (Last-Event-ID).
+    """
+
+    def __init__(self, enabled: bool, backlog: int, keepalive: float):
+        self.enabled = enabled
+        self.backlog = backlog
+        self.keepalive = keepalive
+        self._publish = redis_client.register_script(_PUBLISH_SCRIPT)
+
+    async def publish(self, user: User, change: str, fields: List[str]) -> Optional[int]:
+        """
+        Публикация события об изменении пользователя.
+        Ошибки Redis не прерывают основной запрос - только логируются.
+        """
+        if not self.enabled:
+            return None
+
+        event = {
+            "type": change,  # created, updated
+            "username": user.username,
+            "version": user.version,
+            "is_active": user.is_active,
+            "fields": fields,
+        }
+        try:
+            seq = await self._publish(
+                keys=[SEQUENCE_KEY, BACKLOG_KEY, CHANNEL],
+                args=[json.dumps(event), self.backlog]
+            )
+        except Exception as e:
+            logger.error(f"Error publishing user event for {user.username}: {e}")
+            return None
+        return int(seq)
+
+    async def open_stream(self, since: Optional[int]) -> AsyncIterator[str]:
+        """
+        Поток SSE. Подписка и текущий номер читаются до начала ответа:
+        если Redis недоступен, исключение возникает здесь, а не после
+        отправки заголовков 200.
+        """
+        pubsub = redis_client.pubsub()
+        try:
+            # Подписываемся до чтения журнала, чтобы не потерять события между ними
+            await pubsub.subscribe(CHANNEL)
+            current = int(await redis_client.get(SEQUENCE_KEY) or 0)
+        except Exception:
+            await pubsub.aclose()
+            raise
+        return self._stream(pubsub, since, current)
+
+    async def _stream(self, pubsub, since: Optional[int], current: int) -> AsyncIterator[str]:
+        """
+        Если since задан, сначала отдаются пропущенные события из журнала;
+        если они уже вытеснены - событие reset (потребитель должен сбросить
+        локальный кеш). При потере Redis поток завершается событием error,
+        клиент переподключается с Last-Event-ID.
+        """
+        last = current
+        try:
+            if since is not None and since > current:
+                # Журнал Redis был сброшен - номера начались заново
+                yield _format_sse("reset", {"seq": current}, current)
+            elif since is not None and since < current:
+                oldest = await redis_client.zrange(BACKLOG_KEY, 0, 0, withscores=True)
+                if not oldest or int(oldest[0][1]) > since + 1:
+                    yield _format_sse("reset", {"seq": current}, current)
+                else:
+                    for payload in await redis_client.zrangebyscore(BACKLOG_KEY, since + 1, current):
+                        event = json.loads(payload)
+                        yield _format_sse("user", event, event["seq"])
+            else:
+                yield _format_sse("ready", {"seq": current}, current)
+
+            while True:
+                message = await pubsub.get_message(
+                    ignore_subscribe_messages=True,
+                    timeout=self.keepalive
+                )
+                if message is None:
+                    yield ": keepalive\n\n"
+                    continue
+
+                event = json.loads(message["data"])
+                if event["seq"] <= last:
+                    continue
+                last = event["seq"]
+                yield _format_sse("user", event, last)
+        except Exception as e:
+            logger.error(f"User events stream interrupted: {e}")
+            yield _format_sse("error", {"seq": last, "detail": "Event feed unavailable"})
+        finally:
+            try:
+                await pubsub.unsubscribe(CHANNEL)
+            except Exception:
+                pass
+            await pubsub.aclose()
+
+
+user_events = UserEventFeed(
+    enabled=settings.USER_EVENTS_ENABLED,
+    backlog=settings.USER_EVENTS_BACKLOG,
+    keepalive=settings.USER_EVENTS_KEEPALIVE_SECONDS
+)
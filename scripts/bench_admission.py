@@ -0,0 +1,165 @@
+"""
+Бенчмарк admission control: задержка /auth/validate и /auth/me во время волны входов.
+
+Узкое место моделируется как в реальном коде: ldap_service.authenticate
+выполняется в общем пуле потоков (run_in_threadpool, 40 потоков) и держит
+GIL на разборе ответа (LDAP_CPU) кроме ожидания сети (LDAP_LATENCY).
+Соединение БД занимается только в get_or_create_user (DB_LATENCY) и в
+/auth/me. /auth/validate не использует ни БД, ни пул потоков - его задержку
+определяет загрузка event loop и конкуренция за GIL с потоками входа.
+Сравниваются два прогона - без ограничения и с AdmissionControlMiddleware
+и лимитерами из app.core.admission (как в приложении).
+
+Пример результата (LOGIN_FLOOD=300, LDAP_LATENCY=0.2, LDAP_CPU=0.02, пул 15):
+    without admission control:  validate p99 ~2-4 ms, me p99 ~150-250 ms
+    with admission control:     validate p99 ~2-4 ms, me p99 ~50 ms
+/auth/validate не делит ресурсы со входом и не ждет в очереди ни в одном
+прогоне; /auth/me без ограничения ждет соединение БД за волной входов.
+
+Запуск:
+    SECRET_KEY=bench DATABASE_URL=postgresql+asyncpg://u:p@localhost/db \\
+        python scripts/bench_admission.py
+"""
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ["ADMISSION_CONTROL_ENABLED"] = "False"
+os.environ["AUDIT_ENABLED"] = "False"
+os.environ["GROUP_CLAIMS_ENABLED"] = "False"
+os.environ["CREDENTIAL_CACHE_ENABLED"] = "False"
+os.environ["USER_EVENTS_ENABLED"] = "False"
+os.environ["INVALIDATION_BUS"] = "local"
+
+import httpx  # noqa: E402
+
+from app.main import app  # noqa: E402
+from app.core.admission import AdmissionControlMiddleware, admission_limiters  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from app.database.session import get_db  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.routers import auth  # noqa: E402
+
+logging.disable(logging.WARNING)
+
+LOGIN_FLOOD = 300
+LDAP_LATENCY = 0.2
+LDAP_CPU = 0.02
+DB_LATENCY = 0.005
+DB_POOL_SIZE = 15
+PROBES = 200
+
+db_pool = asyncio.Semaphore(DB_POOL_SIZE)
+fake_user = User(
+    id=1, username="bench", email=None, full_name=None, cn=None,
+    groups=[], is_active=True, is_superuser=False, version=1
+)
+
+
+def fake_ldap_authenticate(username: str, password: str, attributes=None) -> dict:
+    """
+    Синхронный BIND в потоке: ожидание сети без GIL, разбор ответа - с GIL.
+    """
+    time.sleep(LDAP_LATENCY)
+    deadline = time.perf_counter() + LDAP_CPU
+    while time.perf_counter() < deadline:
+        pass
+    return {"username": username, "email": None, "full_name": None, "cn": None, "groups": []}
+
+
+async def fake_get_or_create_user(db, ldap_data: dict) -> User:
+    async with db_pool:
+        await asyncio.sleep(DB_LATENCY)
+    return fake_user
+
+
+class FakeResult:
+    def one_or_none(self):
+        return fake_user
+
+
+class FakeSession:
+    """
+    Сессия БД для /auth/me: каждый запрос занимает соединение из общего пула.
+    """
+
+    async def execute(self, *args, **kwargs):
+        async with db_pool:
+            await asyncio.sleep(0.002)
+        return FakeResult()
+
+
+async def fake_db():
+    yield FakeSession()
+
+
+auth.ldap_service.authenticate = fake_ldap_authenticate
+auth.get_or_create_user = fake_get_or_create_user
+app.dependency_overrides[get_db] = fake_db
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))] * 1000
+
+
+async def probe(client, method, url, **kwargs):
+    latencies = []
+    for _ in range(PROBES):
+        start = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        latencies.append(time.perf_counter() - start)
+        assert response.status_code == 200, f"{url}: unexpected status {response.status_code}"
+        await asyncio.sleep(0.005)
+    return latencies
+
+
+async def run(asgi_app, title):
+    token = create_access_token(data={"sub": "bench"})
+    transport = httpx.ASGITransport(app=asgi_app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        logins = [
+            asyncio.create_task(client.post(
+                "/auth/login",
+                data={"username": f"user{i}", "password": "secret"}
+            ))
+            for i in range(LOGIN_FLOOD)
+        ]
+        await asyncio.sleep(0.05)
+        validate, me = await asyncio.gather(
+            probe(client, "POST", "/auth/validate", json={"token": token}),
+            probe(client, "GET", "/auth/me", headers={"Authorization": f"Bearer {token}"}),
+        )
+        responses = await asyncio.gather(*logins)
+
+    codes = {}
+    for response in responses:
+        codes[response.status_code] = codes.get(response.status_code, 0) + 1
+
+    print(f"== {title}")
+    print(f"   login statuses: {codes}")
+    for name, latencies in (("validate", validate), ("me", me)):
+        print(
+            f"   {name:8s} p50={statistics.median(latencies) * 1000:7.2f} ms  "
+            f"p99={percentile(latencies, 0.99):7.2f} ms"
+        )
+
+
+async def main():
+    await run(app, "without admission control")
+    limited = AdmissionControlMiddleware(app, limiters=admission_limiters, retry_after=2)
+    login = admission_limiters["/auth/login"]
+    await run(
+        limited,
+        f"with admission control (login limit {login.max_concurrency}, "
+        f"queue {login.queue_size}, timeout {login.queue_timeout:.0f}s)"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
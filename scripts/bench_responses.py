@@ -0,0 +1,173 @@
+"""
+Микробенчмарк сериализации ответов: запросов в секунду на одно ядро
+для /auth/validate, /auth/me и /auth/users/{username}.
+
+Приложение вызывается напрямую как ASGI (без сети и HTTP-клиента),
+БД и проверка токена для /auth/me подменяются, поэтому измеряется
+в основном путь FastAPI: разбор запроса, обработчик и сериализация ответа.
+
+Результат на одном ядре (orjson установлен):
+                            до (--baseline)  после
+    POST /auth/validate     ~3200            ~3750 req/s
+    GET /auth/me            ~2500            ~2500 req/s
+    GET /auth/users/ivanov  ~950             ~1000 req/s
+Основная доля времени - разбор JWT (в /auth/users/{username} - еще и
+проверка scope), сериализация ответа после изменения заметна только
+в /auth/validate.
+
+С флагом --baseline воспроизводится столбец "до": обработчики снова отдают
+dict, который FastAPI валидирует по response_model, пропускает через
+jsonable_encoder и сериализует стандартным JSONResponse (json из stdlib).
+
+Запуск:
+    SECRET_KEY=bench DATABASE_URL=postgresql+asyncpg://u:p@localhost/db \\
+        python scripts/bench_responses.py [--baseline]
+"""
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ["ADMISSION_CONTROL_ENABLED"] = "False"
+os.environ["AUDIT_ENABLED"] = "False"
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import APIRoute  # noqa: E402
+from starlette.routing import request_response  # noqa: E402
+
+from app.main import app  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from app.database.session import get_db  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.routers import auth  # noqa: E402
+
+logging.disable(logging.WARNING)
+
+token = create_access_token(data={"sub": "ivanov", "email": "ivanov@utz.local"})
+
+DURATION = 3.0
+BASELINE = "--baseline" in sys.argv[1:]
+
+fake_user = User(
+    id=1,
+    username="ivanov",
+    email="ivanov@utz.local",
+    full_name="Иванов Иван Иванович",
+    cn="Иванов Иван Иванович",
+    groups=[f"CN=Group {i},OU=Groups,DC=utz,DC=local" for i in range(40)],
+    is_active=True,
+    is_superuser=False,
+    version=1
+)
+
+
+class FakeResult:
+    def scalar_one_or_none(self):
+        return fake_user
+
+    def one_or_none(self):
+        return fake_user
+
+
+class FakeSession:
+    async def execute(self, *args, **kwargs):
+        return FakeResult()
+
+
+async def fake_db():
+    yield FakeSession()
+
+
+async def fake_username():
+    return "ivanov"
+
+
+app.dependency_overrides[get_db] = fake_db
+app.dependency_overrides[auth.get_current_username] = fake_username
+app.dependency_overrides[auth.get_current_user] = lambda: fake_user
+app.dependency_overrides[auth.oauth2_scheme] = lambda: token
+
+
+def baseline_response(content, status_code: int = 200, headers=None):
+    """
+    Вместо готового ответа - dict: FastAPI проходит путь response_model.
+    """
+    if status_code != 200:
+        return JSONResponse(content, status_code=status_code, headers=headers)
+    return content
+
+
+def use_baseline() -> None:
+    auth.FastJSONResponse = baseline_response
+    for route in app.routes:
+        if isinstance(route, APIRoute):
+            route.response_class = JSONResponse
+            route.app = request_response(route.get_route_handler())
+
+
+async def call(method: str, path: str, body: bytes = b"", headers=None):
+    scope = {
+        "type": "http",
+        "http_version": "1.1",
+        "method": method,
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "scheme": "http",
+        "server": ("bench", 80),
+        "client": ("127.0.0.1", 1),
+        "headers": [(b"content-type", b"application/json")] + (headers or []),
+    }
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if sent:
+            return {"type": "http.disconnect"}
+        sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    status = None
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def measure(name: str, method: str, path: str, body: bytes = b""):
+    status = await call(method, path, body)
+    assert status == 200, f"{name}: unexpected status {status}"
+
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < DURATION:
+        for _ in range(100):
+            await call(method, path, body)
+        count += 100
+    elapsed = time.perf_counter() - start
+    print(f"   {name:22s} {count / elapsed:9.0f} req/s")
+
+
+async def main():
+    body = json.dumps({"token": token}).encode()
+
+    if BASELINE:
+        use_baseline()
+    mode = "baseline (response_model + JSONResponse)" if BASELINE else "FastJSONResponse"
+    print(f"== {mode}: {len(app.routes)} routes, {DURATION:.0f}s per endpoint")
+    await measure("POST /auth/validate", "POST", "/auth/validate", body)
+    await measure("GET /auth/me", "GET", "/auth/me")
+    await measure("GET /auth/users/ivanov", "GET", "/auth/users/ivanov")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,97 @@
+"""
+Тесты admission control: очередь лимитера, таймаут ожидания и ответ 503.
+"""
+import asyncio
+import json
+
+from app.core.admission import AdmissionControlMiddleware, ConcurrencyLimiter, admission_limiters
+
+
+def test_free_slots_are_taken_without_waiting():
+    async def main():
+        limiter = ConcurrencyLimiter("login", max_concurrency=2, queue_size=0, queue_timeout=1.0)
+        assert await limiter.acquire()
+        assert await limiter.acquire()
+        return limiter.stats()
+
+    assert asyncio.run(main()) == {"limit": 2, "active": 2, "waiting": 0, "rejected": 0}
+
+
+def test_full_queue_rejects_immediately():
+    async def main():
+        limiter = ConcurrencyLimiter("login", max_concurrency=1, queue_size=1, queue_timeout=5.0)
+        await limiter.acquire()
+        queued = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+
+        started = asyncio.get_running_loop().time()
+        assert await limiter.acquire() is False
+        assert asyncio.get_running_loop().time() - started < 0.1
+
+        limiter.release()
+        assert await queued is True
+        return limiter.stats()
+
+    assert asyncio.run(main()) == {"limit": 1, "active": 1, "waiting": 0, "rejected": 1}
+
+
+def test_queue_timeout_rejects():
+    async def main():
+        limiter = ConcurrencyLimiter("login", max_concurrency=1, queue_size=10, queue_timeout=0.05)
+        await limiter.acquire()
+        assert await limiter.acquire() is False
+        return limiter.stats()
+
+    assert asyncio.run(main()) == {"limit": 1, "active": 1, "waiting": 0, "rejected": 1}
+
+
+def test_saturated_route_returns_503_with_retry_after():
+    async def main():
+        done = asyncio.Event()
+        calls = []
+
+        async def app(scope, receive, send):
+            calls.append(scope["path"])
+            await done.wait()
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b"{}"})
+
+        limiter = ConcurrencyLimiter("login", max_concurrency=1, queue_size=0, queue_timeout=1.0)
+        middleware = AdmissionControlMiddleware(app, limiters={"/auth/login": limiter}, retry_after=2)
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        def request(path):
+            messages = []
+
+            async def send(message):
+                messages.append(message)
+
+            scope = {"type": "http", "method": "POST", "path": path, "headers": []}
+            return messages, asyncio.create_task(middleware(scope, receive, send))
+
+        first, first_task = request("/auth/login")
+        await asyncio.sleep(0)
+        rejected, rejected_task = request("/auth/login")
+        await rejected_task
+        # Маршрут без лимитера не ждет занятый слот входа
+        other, other_task = request("/auth/validate")
+        await asyncio.sleep(0)
+        assert calls == ["/auth/login", "/auth/validate"]
+
+        done.set()
+        await asyncio.gather(first_task, other_task)
+        return first, rejected, limiter.stats()
+
+    first, rejected, stats = asyncio.run(main())
+
+    assert first[0]["status"] == 200
+    assert rejected[0]["status"] == 503
+    assert (b"retry-after", b"2") in rejected[0]["headers"]
+    assert "перегружен" in json.loads(rejected[1]["body"])["detail"]
+    assert stats["active"] == 0 and stats["rejected"] == 1
+
+
+def test_heavy_routes_are_limited():
+    assert set(admission_limiters) == {"/auth/login", "/auth/token", "/auth/users"}
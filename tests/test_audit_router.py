@@ -0,0 +1,69 @@
+"""
+Тесты журнала аудита: фильтры since/until с часовым поясом.
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.dialects import postgresql
+
+from app.routers.audit import list_audit_events
+
+
+class FakeResult:
+    def scalars(self):
+        return self
+
+    def all(self):
+        return []
+
+
+class FakeSession:
+    def __init__(self):
+        self.params = None
+
+    async def execute(self, query):
+        self.params = query.compile(dialect=postgresql.dialect()).params
+        return FakeResult()
+
+
+def test_aware_since_until_converted_to_naive_utc():
+    db = FakeSession()
+    msk = timezone(timedelta(hours=3))
+
+    page = asyncio.run(list_audit_events(
+        username=None,
+        event_type=None,
+        success=None,
+        since=datetime(2026, 3, 1, 3, 0, tzinfo=msk),
+        until=datetime(2026, 3, 2, 0, 0, tzinfo=timezone.utc),
+        cursor="2026-03-01T12:00:00+00:00|42",
+        limit=10,
+        db=db,
+        current_user=None
+    ))
+
+    assert page.items == []
+    timestamps = [value for value in db.params.values() if isinstance(value, datetime)]
+    assert sorted(timestamps) == [
+        datetime(2026, 3, 1, 0, 0),
+        datetime(2026, 3, 1, 12, 0),
+        datetime(2026, 3, 2, 0, 0),
+    ]
+
+
+def test_naive_since_left_as_is():
+    db = FakeSession()
+
+    asyncio.run(list_audit_events(
+        username=None,
+        event_type=None,
+        success=None,
+        since=datetime(2026, 3, 1, 5, 0),
+        until=None,
+        cursor=None,
+        limit=10,
+        db=db,
+        current_user=None
+    ))
+
+    assert datetime(2026, 3, 1, 5, 0) in db.params.values()
@@ -0,0 +1,133 @@
+"""
+Тесты буфера журнала аудита: переполнение, пачки, повтор после ошибки, остановка.
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+from app.services.audit_service import AuditLog
+
+
+class FakeConn:
+    def __init__(self, engine):
+        self.engine = engine
+        self.dialect = SimpleNamespace(driver=engine.driver)
+
+    async def execute(self, statement, *args):
+        if self.engine.fail:
+            raise ConnectionRefusedError("[Errno 111] Connect call failed")
+        # Многострочный INSERT: одна команда на пачку
+        if statement.is_insert:
+            params = statement.compile().params
+            self.engine.batches.append([
+                params[f"username_m{index}"] for index in range(len(params) // 7)
+            ])
+
+    async def get_raw_connection(self):
+        engine = self.engine
+
+        class Driver:
+            async def copy_records_to_table(self, table_name, *, records, columns):
+                engine.copies.append((table_name, columns, records))
+
+        return SimpleNamespace(driver_connection=Driver())
+
+
+class FakeEngine:
+    def __init__(self, driver="psycopg"):
+        self.driver = driver
+        self.fail = False
+        self.batches = []
+        self.copies = []
+
+    @asynccontextmanager
+    async def begin(self):
+        yield FakeConn(self)
+
+
+def _audit_log(engine=None, buffer_size=100, batch_size=2):
+    log = AuditLog(enabled=True, buffer_size=buffer_size, batch_size=batch_size, flush_interval=60)
+    log._engine = engine
+    return log
+
+
+def _record(log, *usernames):
+    for username in usernames:
+        log.record(event_type="login", success=True, username=username)
+
+
+def test_full_buffer_drops_and_counts():
+    log = _audit_log(buffer_size=3)
+
+    _record(log, "a", "b", "c", "d", "e")
+
+    assert log.stats()["buffered"] == 3
+    assert log.recorded == 3
+    assert log.dropped == 2
+
+
+def test_flush_writes_in_batches():
+    engine = FakeEngine()
+    log = _audit_log(engine, batch_size=2)
+    _record(log, "a", "b", "c", "d", "e")
+
+    assert asyncio.run(log.flush()) == 5
+
+    assert engine.batches == [["a", "b"], ["c", "d"], ["e"]]
+    assert log.written == 5
+    assert log.stats()["buffered"] == 0
+
+
+def test_asyncpg_flush_uses_copy():
+    engine = FakeEngine(driver="asyncpg")
+    log = _audit_log(engine, batch_size=10)
+    _record(log, "a", "b")
+
+    asyncio.run(log.flush())
+
+    table, columns, records = engine.copies[0]
+    assert table == "auth_audit_events"
+    assert [record[columns.index("username")] for record in records] == ["a", "b"]
+    assert engine.batches == []
+
+
+def test_failed_flush_requeues_batch_in_order():
+    engine = FakeEngine()
+    log = _audit_log(engine, batch_size=2)
+    _record(log, "a", "b", "c")
+
+    engine.fail = True
+    assert asyncio.run(log.flush()) == 0
+    assert log.flush_errors == 1
+    assert log.stats()["buffered"] == 3
+
+    engine.fail = False
+    asyncio.run(log.flush())
+    assert engine.batches == [["a", "b"], ["c"]]
+
+
+def test_requeue_drops_overflow():
+    log = _audit_log(buffer_size=4, batch_size=2)
+    _record(log, "a", "b", "c")
+    batch = log._take_batch()
+    _record(log, "d", "e")
+
+    log._requeue(batch)
+
+    assert [row["username"] for row in log._buffer] == ["a", "c", "d", "e"]
+    assert log.dropped == 1
+
+
+def test_stop_drains_buffer():
+    engine = FakeEngine()
+    log = _audit_log(batch_size=100)
+
+    async def main():
+        log.start(engine)
+        _record(log, "a", "b", "c")
+        await log.stop()
+
+    asyncio.run(main())
+
+    assert engine.batches == [["a", "b", "c"]]
+    assert log.stats()["buffered"] == 0
@@ -0,0 +1,51 @@
+"""
+Тесты кеша учетных данных (bcrypt через pwd_context).
+"""
+import asyncio
+
+from app.services.credential_cache import CredentialCache
+
+LDAP_DATA = {"username": "ivanov", "email": "ivanov@utz.local", "groups": []}
+
+
+def _cache(ttl=300, outage_ttl=3600, max_entries=10):
+    return CredentialCache(enabled=True, ttl_seconds=ttl, outage_ttl_seconds=outage_ttl, max_entries=max_entries)
+
+
+def test_store_then_verify_hits_cache():
+    cache = _cache()
+
+    async def scenario():
+        await cache.store("Ivanov", "P@ssw0rd", LDAP_DATA)
+        return await cache.verify("ivanov", "P@ssw0rd"), await cache.verify("ivanov", "wrong")
+
+    hit, miss = asyncio.run(scenario())
+
+    assert hit == LDAP_DATA
+    assert miss is None
+
+
+def test_outage_ttl_outlives_regular_ttl():
+    cache = _cache(ttl=0)
+
+    async def scenario():
+        await cache.store("ivanov", "P@ssw0rd", LDAP_DATA)
+        await asyncio.sleep(0.01)
+        return await cache.verify("ivanov", "P@ssw0rd"), await cache.verify_during_outage("ivanov", "P@ssw0rd")
+
+    regular, outage = asyncio.run(scenario())
+
+    assert regular is None
+    assert outage == LDAP_DATA
+
+
+def test_invalidate_and_lru_eviction():
+    cache = _cache(max_entries=2)
+
+    async def scenario():
+        for username in ("a", "b", "c"):
+            await cache.store(username, "pw", {"username": username})
+        cache.invalidate("c")
+        return [await cache.verify(username, "pw") for username in ("a", "b", "c")]
+
+    assert asyncio.run(scenario()) == [None, {"username": "b"}, None]
@@ -0,0 +1,116 @@
+"""
+Тесты словаря групп и битового множества групп в токене.
+"""
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from starlette.requests import Request
+
+from app.core.security import create_refresh_token, decode_token
+from app.routers import auth as auth_module
+from app.schemas.auth import RefreshTokenRequest
+from app.services import group_dictionary as dictionary_module
+from app.services.group_dictionary import (
+    GroupDictionary,
+    decode_group_bitset,
+    encode_group_bitset,
+    has_group,
+)
+
+
+def test_bitset_roundtrip():
+    ids = {1, 2, 9, 64, 700}
+    encoded = encode_group_bitset(ids)
+
+    assert decode_group_bitset(encoded) == ids
+    assert has_group(encoded, 700)
+    assert not has_group(encoded, 3)
+    assert not has_group(encoded, 5000)
+
+
+@pytest.fixture
+def ldap_groups(monkeypatch):
+    """
+    Таблица ldap_groups в памяти; журнал выполненных операций.
+    """
+    table = {}
+    log = []
+
+    class FakeResult:
+        def all(self):
+            return [SimpleNamespace(id=group_id, dn=dn) for dn, group_id in table.items()]
+
+    class FakeSession:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def execute(self, statement):
+            sql = str(statement)
+            if getattr(statement, "is_insert", False):
+                log.append("insert")
+                params = statement.compile(dialect=postgresql.dialect()).params
+                for key in sorted(params):
+                    if key.startswith("dn"):
+                        table.setdefault(params[key], len(table) + 1)
+            elif "pg_advisory_xact_lock" in sql:
+                log.append("lock")
+            else:
+                log.append("select")
+            return FakeResult()
+
+        async def commit(self):
+            log.append("commit")
+
+    async def invalidate(namespace, key, local=True):
+        log.append("invalidate")
+
+    monkeypatch.setattr(dictionary_module, "AsyncSessionLocal", FakeSession)
+    monkeypatch.setattr(dictionary_module.invalidation_bus, "invalidate", invalidate)
+    return SimpleNamespace(table=table, log=log)
+
+
+def test_registration_takes_lock_before_insert(ldap_groups):
+    dictionary = GroupDictionary()
+
+    ids, version = asyncio.run(dictionary.ensure_ids(["CN=A", "CN=B"]))
+
+    assert ldap_groups.log == ["select", "lock", "insert", "commit", "select", "invalidate"]
+    assert sorted(ids) == [1, 2]
+    assert version == 2
+
+
+def test_known_groups_do_not_touch_database(ldap_groups):
+    dictionary = GroupDictionary()
+    asyncio.run(dictionary.ensure_ids(["CN=A"]))
+    ldap_groups.log.clear()
+
+    ids, version = asyncio.run(dictionary.ensure_ids(["CN=A"]))
+
+    assert ldap_groups.log == []
+    assert ids == [1]
+    assert version == 1
+
+
+def test_refresh_without_database_issues_token_without_groups(monkeypatch):
+    monkeypatch.setattr(auth_module.settings, "GROUP_CLAIMS_ENABLED", True)
+
+    class DownSession:
+        async def execute(self, statement):
+            raise ConnectionRefusedError("[Errno 111] Connect call failed")
+
+    refresh = create_refresh_token(data={"sub": "ivanov"})
+    http_request = Request({"type": "http", "headers": [], "client": ("127.0.0.1", 12345)})
+
+    response = asyncio.run(auth_module.refresh_token(
+        RefreshTokenRequest(refresh_token=refresh), http_request, DownSession()
+    ))
+    payload = decode_token(json.loads(response.body)["access_token"])
+
+    assert payload["sub"] == "ivanov"
+    assert "grp" not in payload
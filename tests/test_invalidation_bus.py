@@ -0,0 +1,132 @@
+"""
+Тесты шины инвалидации: рассылка между воркерами, свои сообщения, resync.
+"""
+import asyncio
+
+import pytest
+
+from app.services.invalidation_bus import USER, InvalidationBus, LocalTransport, RedisTransport
+
+
+def _bus(transport):
+    bus = InvalidationBus(transport, reconnect_delay=0.01)
+    bus.applied = []
+    bus.flushed = 0
+
+    def flush():
+        bus.flushed += 1
+
+    bus.register(USER, bus.applied.append, flush)
+    return bus
+
+
+def test_invalidation_fans_out_to_other_workers():
+    transport = LocalTransport()
+    first, second = _bus(transport), _bus(transport)
+
+    async def main():
+        first.start()
+        second.start()
+        await asyncio.sleep(0)
+        await first.invalidate(USER, "ivanov")
+        await second.invalidate(USER, "petrov", local=False)
+        await asyncio.sleep(0.01)
+        await first.stop()
+        await second.stop()
+
+    asyncio.run(main())
+
+    # Собственное сообщение не применяется повторно
+    assert first.applied == ["ivanov", "petrov"]
+    assert second.applied == ["ivanov"]
+    assert first.received == 1 and second.received == 1
+
+
+class FlakyTransport(LocalTransport):
+    """
+    Первая подписка обрывается с ошибкой, как при потере соединения с Redis.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.subscriptions = 0
+
+    async def subscribe(self):
+        self.subscriptions += 1
+        if self.subscriptions == 1:
+            return self._broken()
+        return await super().subscribe()
+
+    async def _broken(self):
+        raise ConnectionError("Connection reset by peer")
+        yield
+
+
+def test_reconnect_flushes_local_caches():
+    transport = FlakyTransport()
+    bus = _bus(transport)
+
+    async def main():
+        bus.start()
+        await asyncio.sleep(0.05)
+        await InvalidationBus(transport).invalidate(USER, "ivanov")
+        await asyncio.sleep(0.01)
+        await bus.stop()
+
+    asyncio.run(main())
+
+    assert transport.subscriptions == 2
+    assert bus.resyncs == 1 and bus.flushed == 1
+    assert bus.applied == ["ivanov"]
+
+
+class SilentPubSub:
+    """
+    Подписка на мертвом соединении: сообщений нет, PING уходит без ответа.
+    """
+
+    def __init__(self):
+        self.pings = 0
+        self.closed = False
+
+    async def get_message(self, ignore_subscribe_messages, timeout):
+        await asyncio.sleep(timeout)
+        return None
+
+    async def ping(self):
+        self.pings += 1
+
+    async def aclose(self):
+        self.closed = True
+
+
+def test_redis_transport_detects_silent_connection():
+    pubsub = SilentPubSub()
+    transport = RedisTransport(keepalive=0.01)
+
+    async def main():
+        async for _ in transport._iterate(pubsub):
+            pass
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(main())
+    assert pubsub.pings == 1
+    assert pubsub.closed
+
+
+def test_redis_transport_skips_pong():
+    messages = [
+        None,
+        {"type": "pong", "data": ""},
+        {"type": "message", "data": '{"ns": "user"}'},
+    ]
+
+    class PubSub(SilentPubSub):
+        async def get_message(self, ignore_subscribe_messages, timeout):
+            return messages.pop(0)
+
+    async def main():
+        iterator = RedisTransport(keepalive=0.01)._iterate(PubSub())
+        return await iterator.__anext__()
+
+    assert asyncio.run(main()) == '{"ns": "user"}'
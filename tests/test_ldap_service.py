@@ -0,0 +1,128 @@
+"""
+Тесты LDAPService на mock-каталоге ldap3 (MOCK_SYNC).
+
+Ответы проходят через обработку ldap3 (get_response / post_send_search),
+а mock_search эмулирует поведение AD для многозначных атрибутов:
+не больше RANGE_SIZE значений за ответ, имя атрибута с тегом range.
+"""
+import re
+
+import pytest
+from ldap3 import Server, Connection, MOCK_SYNC, OFFLINE_AD_2012_R2
+from ldap3.core.exceptions import LDAPBindError
+
+from app.services import ldap_service as ldap_module
+from app.services.ldap_service import LDAPService
+
+RANGE_SIZE = 1500
+USER_DN = "CN=Ivanov Ivan,OU=Users,DC=utz,DC=local"
+PASSWORD = "P@ssw0rd"
+
+_RANGE_RE = re.compile(r"^memberOf;range=(\d+)-\*$", re.IGNORECASE)
+
+
+def _groups(count):
+    return [f"CN=Group {i},OU=Groups,DC=utz,DC=local" for i in range(count)]
+
+
+def _ranged_mock_search(original, groups):
+    """
+    mock_search с выдачей memberOf частями, как это делает AD.
+    """
+    def chunk(low):
+        high = low + RANGE_SIZE - 1
+        values = groups[low:high + 1]
+        tag = "*" if high >= len(groups) - 1 else str(high)
+        return {
+            "type": f"memberOf;range={low}-{tag}",
+            "vals": [value.encode() for value in values],
+        }
+
+    def mock_search(request, controls):
+        responses, result = original(request, controls)
+        requested = [str(attribute) for attribute in request["attributes"]]
+        for entry in responses:
+            attributes = [
+                attribute for attribute in entry["attributes"]
+                if attribute["type"].lower() != "memberof"
+            ]
+            for name in requested:
+                match = _RANGE_RE.match(name)
+                if match:
+                    attributes.append(chunk(int(match.group(1))))
+                elif name.lower() == "memberof" and len(groups) > RANGE_SIZE:
+                    attributes.append(chunk(0))
+                elif name.lower() == "memberof":
+                    attributes.append({"type": "memberOf", "vals": [g.encode() for g in groups]})
+            entry["attributes"] = attributes
+        return responses, result
+
+    return mock_search
+
+
+@pytest.fixture
+def directory(monkeypatch):
+    """
+    Подмена ldap3.Connection в ldap_service: тот же конструктор и параметры,
+    но стратегия MOCK_SYNC с одним пользователем.
+    Возвращает функцию, задающую число групп пользователя.
+    """
+    state = {"groups": []}
+    server = Server("dc03.utz.local", get_info=OFFLINE_AD_2012_R2)
+
+    def connection_factory(_server, user, password, auto_bind=False, **kwargs):
+        conn = Connection(server, user=USER_DN, password=password, client_strategy=MOCK_SYNC, **kwargs)
+        conn.strategy.add_entry(USER_DN, {
+            "objectClass": ["top", "person", "organizationalPerson", "user"],
+            "sAMAccountName": "ivanov",
+            "cn": "Ivanov Ivan",
+            "displayName": "Иванов Иван Иванович",
+            "mail": "ivanov@utz.local",
+            "department": "ОГК",
+            "memberOf": state["groups"] or [],
+            "userPassword": PASSWORD,
+        })
+        conn.strategy.mock_search = _ranged_mock_search(conn.strategy.mock_search, state["groups"])
+        if auto_bind and not conn.bind():
+            raise LDAPBindError("invalid credentials")
+        return conn
+
+    monkeypatch.setattr(ldap_module, "Connection", connection_factory)
+
+    def set_groups(count):
+        state["groups"][:] = _groups(count)
+
+    return set_groups
+
+
+@pytest.mark.parametrize("count", [0, 10, RANGE_SIZE, RANGE_SIZE + 1, 3000, 4200])
+def test_authenticate_returns_all_groups(directory, count):
+    directory(count)
+
+    user_data = LDAPService().authenticate("ivanov", PASSWORD)
+
+    assert user_data is not None
+    assert user_data["username"] == "ivanov"
+    assert user_data["email"] == "ivanov@utz.local"
+    assert user_data["full_name"] == "Иванов Иван Иванович"
+    assert user_data["groups"] == _groups(count)
+
+
+def test_authenticate_projects_requested_attributes(directory):
+    directory(2)
+
+    user_data = LDAPService().authenticate(
+        "ivanov",
+        PASSWORD,
+        attributes=["sAMAccountName", "memberOf", "department"]
+    )
+
+    assert user_data["department"] == "ОГК"
+    assert user_data["email"] is None
+    assert user_data["groups"] == _groups(2)
+
+
+def test_authenticate_rejects_wrong_password(directory):
+    directory(10)
+
+    assert LDAPService().authenticate("ivanov", "wrong") is None
@@ -0,0 +1,99 @@
+"""
+Тесты профилировщика медленных запросов: потоковые ответы не профилируются.
+"""
+import asyncio
+
+from app.core.profiler import ProfileStore, SlowRequestProfilerMiddleware, stage
+from app.services.single_flight import SingleFlight
+
+
+def _app(content_type: bytes, duration: float):
+    async def app(scope, receive, send):
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", content_type)]
+        })
+        await asyncio.sleep(duration)
+        await send({"type": "http.response.body", "body": b"{}"})
+    return app
+
+
+def _run(app, path: str, exclude_paths=()) -> ProfileStore:
+    store = ProfileStore(50)
+    middleware = SlowRequestProfilerMiddleware(
+        app, store=store, threshold=0.01, interval=0.001, exclude_paths=exclude_paths
+    )
+    scope = {"type": "http", "method": "GET", "path": path}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    asyncio.run(middleware(scope, receive, send))
+    return store
+
+
+def test_slow_request_is_profiled():
+    store = _run(_app(b"application/json", 0.05), "/auth/me")
+
+    profiles = store.list()
+    assert len(profiles) == 1
+    assert profiles[0]["path"] == "/auth/me"
+    assert store.get(profiles[0]["id"])["samples"]
+
+
+def test_event_stream_response_is_not_profiled():
+    store = _run(_app(b"text/event-stream; charset=utf-8", 0.05), "/stream")
+
+    assert store.list() == []
+
+
+def test_excluded_path_is_not_profiled():
+    store = _run(
+        _app(b"application/json", 0.05),
+        "/auth/events/users",
+        exclude_paths=("/auth/events/users",)
+    )
+
+    assert store.list() == []
+
+
+def test_single_flight_work_is_sampled_for_every_waiter():
+    flight = SingleFlight()
+
+    async def slow_ldap_bind():
+        with stage("ldap"):
+            await asyncio.sleep(0.05)
+        return "user"
+
+    async def app(scope, receive, send):
+        await flight.do("ivanov", slow_ldap_bind)
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    store = ProfileStore(50)
+    middleware = SlowRequestProfilerMiddleware(app, store=store, threshold=0.01, interval=0.001)
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    async def main():
+        scope = {"type": "http", "method": "POST", "path": "/auth/login"}
+        await asyncio.gather(
+            middleware(dict(scope), receive, send),
+            middleware(dict(scope), receive, send)
+        )
+
+    asyncio.run(main())
+
+    profiles = [store.get(profile["id"]) for profile in store.list()]
+    assert len(profiles) == 2
+    for profile in profiles:
+        assert profile["stages_ms"]["ldap"] >= 40
+        assert any("slow_ldap_bind" in stack for stack in profile["samples"])
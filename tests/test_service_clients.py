@@ -0,0 +1,137 @@
+"""
+Тесты сервисных клиентов: проверка секрета с кешем и scope в токене.
+"""
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.core.admission import admission_limiters
+from app.core.security import create_access_token, create_service_token
+from app.routers.auth import get_current_username, require_scopes, validate_token
+from app.schemas.auth import TokenValidationRequest
+from app.services import client_registry as registry_module
+from app.services.client_registry import ClientRegistry, hash_client_secret
+
+SECRET = "s3cr3t-value"
+
+
+def _request():
+    return Request({"type": "http", "headers": [], "client": ("127.0.0.1", 12345)})
+
+
+@pytest.fixture
+def clients_table(monkeypatch):
+    """
+    Таблица service_clients из одной строки; считает запросы к БД.
+    """
+    row = SimpleNamespace(
+        secret_hash=asyncio.run(hash_client_secret(SECRET)),
+        scopes=["users:read"],
+        is_active=True
+    )
+    queries = []
+
+    class FakeResult:
+        def one_or_none(self):
+            return row
+
+    class FakeSession:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def execute(self, statement):
+            queries.append(statement)
+            return FakeResult()
+
+    monkeypatch.setattr(registry_module, "AsyncSessionLocal", FakeSession)
+    return SimpleNamespace(row=row, queries=queries)
+
+
+def test_verified_client_is_served_from_cache(clients_table):
+    registry = ClientRegistry(ttl_seconds=300, max_entries=10)
+
+    first = asyncio.run(registry.verify("billing", SECRET))
+    second = asyncio.run(registry.verify("billing", SECRET))
+
+    assert first == (True, ["users:read"])
+    assert second == (True, ["users:read"])
+    assert len(clients_table.queries) == 1
+    assert registry.stats()["hits"] == 1
+
+
+def test_wrong_secret_and_invalidation(clients_table):
+    registry = ClientRegistry(ttl_seconds=300, max_entries=10)
+
+    assert asyncio.run(registry.verify("billing", "wrong")) == (False, [])
+    assert asyncio.run(registry.verify("billing", SECRET))[0] is True
+
+    registry.invalidate("billing")
+    clients_table.row.is_active = False
+
+    assert asyncio.run(registry.verify("billing", SECRET)) == (False, [])
+    assert len(clients_table.queries) == 3
+
+
+def test_require_scopes_accepts_service_token_with_scope():
+    token = create_service_token("billing", ["users:read"])
+
+    assert asyncio.run(require_scopes("users:read")(_request(), token)) == "billing"
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(require_scopes("groups:read")(_request(), token))
+    assert error.value.status_code == 403
+
+
+def test_require_scopes_user_tokens():
+    token = create_access_token({"sub": "ivanov"})
+
+    assert asyncio.run(require_scopes("users:read")(_request(), token)) == "ivanov"
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(require_scopes("users:read", allow_users=False)(_request(), token))
+    assert error.value.status_code == 401
+
+
+def test_service_token_is_not_a_user_token():
+    token = create_service_token("billing", ["users:read"])
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(get_current_username(_request(), token))
+    assert error.value.status_code == 401
+
+
+def test_validate_rejects_service_token_by_default():
+    token = create_service_token("billing", [])
+
+    response = asyncio.run(validate_token(TokenValidationRequest(token=token), _request()))
+    body = json.loads(response.body)
+
+    assert body["valid"] is False
+    assert body["username"] is None
+    assert "client_id" not in body
+
+
+def test_validate_reports_client_and_scopes():
+    token = create_service_token("billing", ["users:read", "groups:read"])
+
+    response = asyncio.run(validate_token(
+        TokenValidationRequest(token=token, allow_service=True), _request()
+    ))
+    body = json.loads(response.body)
+
+    assert body["valid"] is True
+    assert body["username"] is None
+    assert body["token_type"] == "service"
+    assert body["client_id"] == "billing"
+    assert body["scopes"] == ["groups:read", "users:read"]
+
+
+def test_client_token_endpoint_is_admission_limited():
+    assert admission_limiters["/auth/token"].name == "client_token"
@@ -0,0 +1,135 @@
+"""
+Тесты SingleFlight: один вызов на ключ, общий результат и исключение, отмена ожидающего.
+"""
+import asyncio
+
+import pytest
+
+from app.services.single_flight import SingleFlight
+
+
+class Counter:
+    """
+    Функция, которая ждет сигнала release; считает запуски.
+    """
+
+    def __init__(self, result="ok", error=None):
+        self.calls = 0
+        self.result = result
+        self.error = error
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return f"{self.result}-{self.calls}"
+
+
+def test_concurrent_calls_run_once_and_share_result():
+    async def main():
+        flight = SingleFlight()
+        func = Counter()
+        waiters = [asyncio.create_task(flight.do("ivanov", func)) for _ in range(5)]
+        await asyncio.sleep(0)
+        assert flight.in_flight() == 1
+
+        func.release.set()
+        results = await asyncio.gather(*waiters)
+        return flight, func, results
+
+    flight, func, results = asyncio.run(main())
+
+    assert func.calls == 1
+    assert results == ["ok-1"] * 5
+    assert flight.in_flight() == 0
+
+
+def test_concurrent_calls_share_exception():
+    async def main():
+        flight = SingleFlight()
+        func = Counter(error=ConnectionError("LDAP server unavailable"))
+        waiters = [asyncio.create_task(flight.do("ivanov", func)) for _ in range(3)]
+        await asyncio.sleep(0)
+        func.release.set()
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+        return flight, func, results
+
+    flight, func, results = asyncio.run(main())
+
+    assert func.calls == 1
+    assert all(isinstance(result, ConnectionError) for result in results)
+    assert len({id(result) for result in results}) == 1
+    assert flight.in_flight() == 0
+
+
+def test_key_is_released_and_next_call_runs_again():
+    async def main():
+        flight = SingleFlight()
+        func = Counter()
+        func.release.set()
+        first = await flight.do("ivanov", func)
+        second = await flight.do("ivanov", func)
+        return func, first, second
+
+    func, first, second = asyncio.run(main())
+
+    assert (first, second) == ("ok-1", "ok-2")
+    assert func.calls == 2
+
+
+def test_different_keys_run_separately():
+    async def main():
+        flight = SingleFlight()
+        func = Counter()
+        func.release.set()
+        return func, await asyncio.gather(flight.do("ivanov", func), flight.do("petrov", func))
+
+    func, results = asyncio.run(main())
+
+    assert func.calls == 2
+    assert sorted(results) == ["ok-1", "ok-2"]
+
+
+def test_cancelled_waiter_does_not_cancel_shared_call():
+    async def main():
+        flight = SingleFlight()
+        func = Counter()
+        cancelled = asyncio.create_task(flight.do("ivanov", func))
+        waiter = asyncio.create_task(flight.do("ivanov", func))
+        await asyncio.sleep(0)
+
+        cancelled.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        assert flight.in_flight() == 1
+
+        func.release.set()
+        return flight, func, await waiter
+
+    flight, func, result = asyncio.run(main())
+
+    assert result == "ok-1"
+    assert func.calls == 1
+    assert flight.in_flight() == 0
+
+
+def test_all_waiters_cancelled_call_still_completes():
+    async def main():
+        flight = SingleFlight()
+        func = Counter()
+        waiter = asyncio.create_task(flight.do("ivanov", func))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+
+        func.release.set()
+        # Следующий вызов присоединяется к той же задаче, пока она не завершилась
+        return func, await flight.do("ivanov", func), flight
+
+    func, result, flight = asyncio.run(main())
+
+    assert result == "ok-1"
+    assert func.calls == 1
+    assert flight.in_flight() == 0
@@ -0,0 +1,68 @@
+"""
+Тесты DDL при старте: ошибка одной операции не откатывает остальные.
+"""
+import asyncio
+from contextlib import asynccontextmanager
+
+from sqlalchemy import create_mock_engine
+from sqlalchemy.dialects import postgresql
+
+from app import main as main_module
+from app.database.session import Base
+from app.models.user import User
+
+
+def test_create_all_skips_trigram_indexes():
+    statements = []
+    engine = create_mock_engine(
+        "postgresql://",
+        lambda sql, *args, **kwargs: statements.append(str(sql.compile(dialect=engine.dialect)))
+    )
+
+    Base.metadata.create_all(engine, checkfirst=False, tables=[User.__table__])
+
+    ddl = "\n".join(statements)
+    assert "CREATE TABLE users" in ddl
+    assert "ix_users_groups_jsonb" in ddl
+    assert "gin_trgm_ops" not in ddl
+
+
+class FakeEngine:
+    """
+    Каждый begin() - отдельная транзакция; фиксируются только успешные.
+    Расширение pg_trgm недоступно, как у роли без прав на CREATE EXTENSION.
+    """
+
+    def __init__(self):
+        self.committed = []
+
+    @asynccontextmanager
+    async def begin(self):
+        transaction = []
+
+        class Conn:
+            async def execute(self, statement, *args):
+                sql = str(statement.compile(dialect=postgresql.dialect()))
+                if "pg_trgm" in sql or "gin_trgm_ops" in sql:
+                    raise RuntimeError("permission denied to create extension")
+                transaction.append(sql)
+
+            async def run_sync(self, fn):
+                transaction.append("create_all")
+
+        yield Conn()
+        self.committed.extend(transaction)
+
+
+def test_startup_without_pg_trgm_keeps_schema(monkeypatch):
+    engine = FakeEngine()
+    monkeypatch.setattr(main_module, "engine", engine)
+    monkeypatch.setattr(main_module.audit_log, "start", lambda engine: None)
+    monkeypatch.setattr(main_module.invalidation_bus, "start", lambda: None)
+
+    asyncio.run(main_module.startup_event())
+
+    assert "create_all" in engine.committed
+    assert any("ADD COLUMN IF NOT EXISTS version" in sql for sql in engine.committed)
+    assert any("ix_users_groups_jsonb" in sql for sql in engine.committed)
+    assert not any("trgm" in sql for sql in engine.committed)
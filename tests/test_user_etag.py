@@ -0,0 +1,103 @@
+"""
+Тесты ETag публичных данных пользователя: If-None-Match, 304 и версия.
+"""
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from starlette.requests import Request
+
+from app.models.user import User
+from app.routers.auth import _get_user_conditional, _user_etag, apply_ldap_data, etag_matches
+
+ROW = SimpleNamespace(
+    id=7,
+    version=3,
+    username="ivanov",
+    email="ivanov@utz.local",
+    full_name="Иванов Иван",
+    cn="Иванов Иван",
+    groups=["CN=Dev,DC=utz,DC=local"],
+    is_active=True
+)
+
+
+def _request(if_none_match=None):
+    headers = []
+    if if_none_match is not None:
+        headers.append((b"if-none-match", if_none_match.encode()))
+    return Request({"type": "http", "headers": headers, "client": ("127.0.0.1", 12345)})
+
+
+class FakeSession:
+    def __init__(self, row):
+        self.row = row
+        self.queries = 0
+
+    async def execute(self, statement):
+        self.queries += 1
+        row = self.row
+
+        class Result:
+            def one_or_none(self):
+                return row
+
+        return Result()
+
+
+@pytest.mark.parametrize("header, expected", [
+    ('"7.3"', True),
+    ('W/"7.3"', True),
+    ('"1.1", "7.3"', True),
+    ("*", True),
+    ('"7.2"', False),
+    ('"7.33"', False),
+    (None, False),
+])
+def test_etag_matches(header, expected):
+    assert etag_matches(_request(header), '"7.3"') is expected
+
+
+def test_matching_etag_returns_304_with_one_query():
+    db = FakeSession(ROW)
+
+    response = asyncio.run(_get_user_conditional(_request('"7.3"'), db, "ivanov"))
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == _user_etag(7, 3)
+    assert response.body == b""
+    assert db.queries == 1
+
+
+def test_stale_etag_returns_body_with_current_etag():
+    db = FakeSession(ROW)
+
+    response = asyncio.run(_get_user_conditional(_request('"7.2"'), db, "ivanov"))
+
+    assert response.status_code == 200
+    assert response.headers["etag"] == '"7.3"'
+    assert json.loads(response.body)["username"] == "ivanov"
+    assert db.queries == 2
+
+
+def test_missing_user_returns_none():
+    assert asyncio.run(_get_user_conditional(_request('"7.3"'), FakeSession(None), "nobody")) is None
+
+
+def test_changed_ldap_data_bumps_version_in_sql():
+    user = User(username="ivanov", email="old@utz.local", full_name=None, cn=None, groups=[], version=3)
+
+    changed = apply_ldap_data(user, {"email": "new@utz.local", "full_name": None, "cn": None, "groups": []})
+
+    assert changed == ["email"]
+    # version = version + 1 вычисляется в UPDATE, а не в Python
+    assert str(user.version.compile(dialect=postgresql.dialect())).startswith("users.version + ")
+
+
+def test_unchanged_ldap_data_keeps_version():
+    user = User(username="ivanov", email="a@utz.local", full_name=None, cn=None, groups=[], version=3)
+
+    assert apply_ldap_data(user, {"email": "a@utz.local", "groups": []}) == []
+    assert user.version == 3
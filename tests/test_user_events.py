@@ -0,0 +1,157 @@
+"""
+Тесты ленты изменений пользователей: продолжение, reset, повторы и недоступный Redis.
+"""
+import asyncio
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from app.routers import events as events_router
+from app.services import user_events as user_events_module
+from app.services.user_events import UserEventFeed
+
+
+class FakePubSub:
+    def __init__(self, messages, fail_subscribe=False):
+        self.messages = list(messages)
+        self.fail_subscribe = fail_subscribe
+        self.subscribed = False
+        self.closed = False
+
+    async def subscribe(self, channel):
+        if self.fail_subscribe:
+            raise ConnectionRefusedError("Error 111 connecting to redis:6379")
+        self.subscribed = True
+
+    async def get_message(self, ignore_subscribe_messages=False, timeout=None):
+        if not self.messages:
+            raise ConnectionError("Connection closed by server.")
+        data = self.messages.pop(0)
+        return None if data is None else {"type": "message", "data": json.dumps(data)}
+
+    async def unsubscribe(self, channel):
+        self.subscribed = False
+
+    async def aclose(self):
+        self.closed = True
+
+
+class FakeRedis:
+    """
+    Журнал событий с номерами from_seq..current и сообщения pub/sub.
+    """
+
+    def __init__(self, current, from_seq=1, messages=(), fail_subscribe=False):
+        self.current = current
+        self.backlog = {seq: _event(seq) for seq in range(from_seq, current + 1)}
+        self.pubsub_client = FakePubSub(messages, fail_subscribe)
+
+    def pubsub(self):
+        return self.pubsub_client
+
+    async def get(self, key):
+        return str(self.current).encode()
+
+    async def zrange(self, key, start, end, withscores=False):
+        if not self.backlog:
+            return []
+        seq = min(self.backlog)
+        return [(json.dumps(self.backlog[seq]), float(seq))]
+
+    async def zrangebyscore(self, key, low, high):
+        return [json.dumps(self.backlog[seq]) for seq in sorted(self.backlog) if low <= seq <= high]
+
+
+def _event(seq):
+    return {"seq": seq, "type": "updated", "username": f"user{seq}", "version": 1, "is_active": True, "fields": []}
+
+
+def _parse(chunk):
+    if chunk.startswith(":"):
+        return ("keepalive", None)
+    fields = dict(line.split(": ", 1) for line in chunk.strip().split("\n"))
+    return (fields["event"], json.loads(fields["data"]))
+
+
+def _read(monkeypatch, redis, since):
+    feed = _feed()
+    monkeypatch.setattr(user_events_module, "redis_client", redis)
+
+    async def main():
+        stream = await feed.open_stream(since)
+        return [_parse(chunk) async for chunk in stream]
+
+    return asyncio.run(main())
+
+
+def _feed():
+    return UserEventFeed(enabled=True, backlog=100, keepalive=15)
+
+
+def test_new_consumer_gets_ready_then_live_events(monkeypatch):
+    redis = FakeRedis(current=5, messages=[None, _event(6)])
+
+    chunks = _read(monkeypatch, redis, since=None)
+
+    assert chunks[0] == ("ready", {"seq": 5})
+    assert chunks[1] == ("keepalive", None)
+    assert chunks[2] == ("user", _event(6))
+    assert redis.pubsub_client.closed
+
+
+def test_resume_replays_backlog_and_skips_duplicates(monkeypatch):
+    # 4 и 5 пришли и в журнале, и по pub/sub (подписка до чтения журнала)
+    redis = FakeRedis(current=5, messages=[_event(4), _event(5), _event(6), _event(6)])
+
+    chunks = _read(monkeypatch, redis, since=2)
+
+    seqs = [data["seq"] for event, data in chunks if event == "user"]
+    assert seqs == [3, 4, 5, 6]
+
+
+def test_since_ahead_of_sequence_resets(monkeypatch):
+    redis = FakeRedis(current=5)
+
+    chunks = _read(monkeypatch, redis, since=40)
+
+    assert chunks[0] == ("reset", {"seq": 5})
+
+
+def test_evicted_backlog_resets(monkeypatch):
+    redis = FakeRedis(current=10, from_seq=6)
+
+    chunks = _read(monkeypatch, redis, since=3)
+
+    assert chunks[0] == ("reset", {"seq": 10})
+    assert not any(event == "user" for event, data in chunks)
+
+
+def test_backlog_starting_right_after_since_replays(monkeypatch):
+    redis = FakeRedis(current=10, from_seq=6)
+
+    chunks = _read(monkeypatch, redis, since=5)
+
+    assert [data["seq"] for event, data in chunks if event == "user"] == [6, 7, 8, 9, 10]
+
+
+def test_lost_redis_ends_stream_with_error_event(monkeypatch):
+    redis = FakeRedis(current=5, messages=[_event(6)])
+
+    chunks = _read(monkeypatch, redis, since=None)
+
+    assert chunks[-1] == ("error", {"seq": 6, "detail": "Event feed unavailable"})
+    assert redis.pubsub_client.closed
+
+
+def test_subscribe_failure_returns_503(monkeypatch):
+    redis = FakeRedis(current=5, fail_subscribe=True)
+    monkeypatch.setattr(events_router, "user_events", _feed())
+    monkeypatch.setattr(user_events_module, "redis_client", redis)
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(events_router.stream_user_events(since=None, last_event_id=None, caller="svc"))
+
+    assert exc_info.value.status_code == 503
+    assert exc_info.value.headers["Retry-After"]
+    assert redis.pubsub_client.closed